@@ -85,3 +85,47 @@ document.addEventListener('DOMContentLoaded', function () {
         });
     }
 });
+
+// Infinite scroll for the task lists: each page ends with a "Load more" button
+// carrying the cursor for the next one. It is fetched when scrolled into view
+// (or clicked) and replaced by the returned fragment.
+document.addEventListener('DOMContentLoaded', function () {
+    const observer = 'IntersectionObserver' in window
+        ? new IntersectionObserver((entries) => {
+            entries.forEach((entry) => {
+                if (entry.isIntersecting) loadMore(entry.target);
+            });
+        }, { rootMargin: '400px' })
+        : null;
+
+    function watch(root) {
+        root.querySelectorAll('.load-more').forEach((button) => {
+            button.addEventListener('click', () => loadMore(button));
+            if (observer) observer.observe(button);
+        });
+    }
+
+    function loadMore(button) {
+        if (button.disabled) return;
+        button.disabled = true;
+        if (observer) observer.unobserve(button);
+
+        fetch(button.dataset.url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+            .then((response) => {
+                if (!response.ok) throw new Error(response.statusText);
+                return response.text();
+            })
+            .then((html) => {
+                const page = document.createElement('div');
+                page.innerHTML = html;
+                watch(page);
+                button.replaceWith(...page.childNodes);
+            })
+            .catch(() => {
+                // Leave the button for a manual retry.
+                button.disabled = false;
+            });
+    }
+
+    watch(document);
+});
@@ -0,0 +1,14 @@
+// Shows the chosen file name for styled file inputs.
+const fileInput = document.querySelector('.file-upload-wrapper input[type="file"]');
+const fileNameDisplay = document.getElementById('file-name');
+const previewContainer = document.getElementById('preview-container');
+
+if (fileInput) {
+  fileInput.classList.add('file-upload-input'); // Hide original input
+  fileInput.addEventListener('change', function () {
+    if (this.files && this.files.length > 0) {
+      fileNameDisplay.textContent = this.files[0].name;
+      previewContainer.style.display = 'flex';
+    }
+  });
+}
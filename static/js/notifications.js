@@ -0,0 +1,94 @@
+// Notification Popup System
+let lastNotificationId = localStorage.getItem('lastNotificationId') || 0;
+let notificationCheckInterval = 10000; // Check every 10 seconds
+
+function showNotificationPopup(notification) {
+  const container = document.getElementById('notificationPopupContainer');
+  const popup = document.createElement('div');
+  popup.className = 'notification-popup';
+  popup.innerHTML = `
+    <div class="notification-popup-icon">🔔</div>
+    <div class="notification-popup-content">
+      <p class="notification-popup-message">${notification.message}</p>
+      <div class="notification-popup-time">${notification.time}</div>
+    </div>
+  `;
+
+  // Click to navigate to task or dismiss
+  popup.addEventListener('click', () => {
+    if (notification.task_id) {
+      window.location.href = `/task/${notification.task_id}/`;
+    } else {
+      popup.classList.add('hiding');
+      setTimeout(() => popup.remove(), 300);
+    }
+  });
+
+  // Add hover cursor if clickable
+  if (notification.task_id) {
+    popup.style.cursor = 'pointer';
+  }
+
+  container.appendChild(popup);
+
+  // Auto-dismiss after 5 seconds
+  setTimeout(() => {
+    if (popup.parentElement) {
+      popup.classList.add('hiding');
+      setTimeout(() => popup.remove(), 300);
+    }
+  }, 5000);
+
+  // Update notification badge
+  updateNotificationBadge();
+}
+
+function updateNotificationBadge() {
+  fetch('/api/notifications/unread-count/')
+    .then(response => response.json())
+    .then(data => {
+      const badge = document.querySelector('.notification-badge');
+      const link = document.querySelector('a[href*="notifications"]');
+      if (data.count > 0) {
+        if (badge) {
+          badge.textContent = data.count;
+        } else if (link) {
+          const newBadge = document.createElement('span');
+          newBadge.className = 'notification-badge';
+          newBadge.textContent = data.count;
+          link.appendChild(newBadge);
+        }
+      } else if (badge) {
+        badge.remove();
+      }
+    })
+    .catch(err => console.error('Error updating badge:', err));
+}
+
+function checkForNewNotifications() {
+  fetch(`/api/notifications/latest/?since=${lastNotificationId}`)
+    .then(response => response.json())
+    .then(data => {
+      if (data.notifications && data.notifications.length > 0) {
+        data.notifications.forEach(notification => {
+          showNotificationPopup(notification);
+          if (notification.id > lastNotificationId) {
+            lastNotificationId = notification.id;
+            localStorage.setItem('lastNotificationId', lastNotificationId);
+          }
+        });
+      }
+    })
+    .catch(err => console.error('Error checking notifications:', err));
+}
+
+// Start polling for new notifications
+setInterval(checkForNewNotifications, notificationCheckInterval);
+
+// Initial check on page load
+setTimeout(checkForNewNotifications, 2000);
+
+// If on notifications page, update badge after auto-mark-as-read
+if (window.location.pathname.includes('/notifications/')) {
+  setTimeout(updateNotificationBadge, 500);
+}
@@ -0,0 +1,76 @@
+// Assignee autocomplete for the task create/edit form.
+(function() {
+  const searchInput = document.getElementById('assignee-search');
+  const hiddenInput = document.getElementById('id_assigned_usernames');
+  const suggestionsEl = document.getElementById('assignee-suggestions');
+  const tagsEl = document.getElementById('assignee-tags');
+  if (!searchInput || !hiddenInput) return;
+  const apiUrl = searchInput.dataset.searchUrl;
+
+  let selected = [];
+  const initialVal = hiddenInput.value.trim();
+  if (initialVal) selected = initialVal.split(',').map(s => s.trim()).filter(Boolean);
+
+  let debounceTimer;
+  function fetchSuggestions(q) {
+    if (!q) { renderSuggestions([]); return; }
+    fetch(apiUrl + '?q=' + encodeURIComponent(q))
+      .then(r => r.json())
+      .then(data => {
+        const users = (data.users || []).filter(u => !selected.includes(u));
+        renderSuggestions(users);
+      })
+      .catch(() => renderSuggestions([]));
+  }
+
+  function renderSuggestions(users) {
+    if (users.length === 0) {
+      suggestionsEl.innerHTML = '';
+      return;
+    }
+    suggestionsEl.innerHTML = '<ul class="suggestions-list">' +
+      users.map(u => '<li data-username="' + u + '">' + u + '</li>').join('') + '</ul>';
+    suggestionsEl.querySelectorAll('li').forEach(li => {
+      li.addEventListener('click', () => {
+        selected.push(li.dataset.username);
+        syncHidden();
+        renderTags();
+        searchInput.value = '';
+        suggestionsEl.innerHTML = '';
+        searchInput.focus();
+      });
+    });
+  }
+
+  function renderTags() {
+    tagsEl.innerHTML = selected.map(u => 
+      '<span class="assignee-tag">' + u + ' <button type="button" data-username="' + u + '" aria-label="Remove">×</button></span>'
+    ).join('');
+    tagsEl.querySelectorAll('button').forEach(btn => {
+      btn.addEventListener('click', () => {
+        selected = selected.filter(x => x !== btn.dataset.username);
+        syncHidden();
+        renderTags();
+      });
+    });
+  }
+
+  function syncHidden() {
+    hiddenInput.value = selected.join(', ');
+  }
+
+  searchInput.addEventListener('input', function() {
+    clearTimeout(debounceTimer);
+    const q = this.value.trim();
+    debounceTimer = setTimeout(() => fetchSuggestions(q), 200);
+  });
+  searchInput.addEventListener('focus', function() {
+    const q = this.value.trim();
+    if (q) fetchSuggestions(q);
+  });
+  searchInput.addEventListener('blur', function() {
+    setTimeout(() => { suggestionsEl.innerHTML = ''; }, 150);
+  });
+
+  renderTags();
+})();
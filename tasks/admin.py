@@ -1,7 +1,71 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
-from .models import Task, Notification, Profile, TaskComment
+from django.core.paginator import Paginator
+from django.db.models import Max, Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .models import Task, Notification, Profile, TaskComment, TaskEvent, ApiToken, ArchivedTask
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Changelist paginator for big tables. Counts exactly up to `exact_limit`
+    rows (a bounded COUNT over a LIMIT subquery); past that, an unfiltered
+    list is sized from MAX(pk) and a filtered one is treated as exact_limit+1
+    rows, so no page ever pays for COUNT(*) over the whole table.
+    "Unfiltered" means no conditions beyond the default manager's own (such
+    as Task's deleted_at IS NULL).
+    """
+    exact_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list.order_by()
+        capped = queryset[:self.exact_limit + 1].count()
+        if capped <= self.exact_limit or self.is_filtered(queryset):
+            return capped
+        return max(capped, queryset.aggregate(n=Max('pk'))['n'] or 0)
+
+    @staticmethod
+    def is_filtered(queryset):
+        return queryset.query.where != queryset.model._default_manager.all().query.where
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Defaults for changelists over tables too large to count or sort freely.
+    Search (changelist and autocomplete) only runs lookups an index can
+    serve: case-sensitive exact matches on `exact_search_fields` and
+    case-sensitive prefixes, as ranges, on `prefix_search_fields`. The
+    admin's own '=field' / '^field' mean iexact / istartswith, which SQLite
+    runs as LIKE ... ESCAPE over the whole table. `search_fields` only
+    switches the search box on.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ('-pk',)
+    exact_search_fields = ()
+    prefix_search_fields = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term or not (self.exact_search_fields or self.prefix_search_fields):
+            return super().get_search_results(request, queryset, search_term)
+        matches = Q()
+        for lookup in self.exact_search_fields:
+            relation, _, field = lookup.rpartition('__')
+            if relation:
+                # An id subquery on the related table's unique index, rather
+                # than a join the OR would have to scan.
+                related = self.model._meta.get_field(relation).related_model
+                matches |= Q(**{f'{relation}__in': related._base_manager.filter(**{field: term}).values('pk')})
+            else:
+                matches |= Q(**{lookup: term})
+        for field in self.prefix_search_fields:
+            matches |= Q(**{f'{field}__gte': term, f'{field}__lt': term + '\U0010ffff'})
+        return queryset.filter(matches), False
 
 
 @admin.register(Profile)
@@ -11,26 +75,76 @@ class ProfileAdmin(admin.ModelAdmin):
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(LargeTableAdmin):
     list_display = ('title', 'creator', 'status', 'priority', 'due_date', 'created_at')
-    list_filter = ('status', 'priority', 'created_at')
-    search_fields = ('title', 'description')
-    filter_horizontal = ('assigned_users',)
+    list_filter = ('status', 'priority', 'recurrence', 'created_at')
+    list_select_related = ('creator',)
+    search_fields = ('slug', 'creator__username', 'title')
+    exact_search_fields = ('slug', 'creator__username')
+    prefix_search_fields = ('title',)
+    autocomplete_fields = ('creator', 'assigned_users')
     readonly_fields = ('created_at', 'updated_at', 'completed_at')
-    date_hierarchy = 'due_date'
+
+
+@admin.register(ArchivedTask)
+class ArchivedTaskAdmin(LargeTableAdmin):
+    """Read-only: rows are written by the archive_tasks command."""
+    list_display = ('title', 'creator', 'completed_at', 'archived_at')
+    list_select_related = ('creator',)
+    search_fields = ('slug', 'creator__username', 'title')
+    exact_search_fields = ('slug', 'creator__username')
+    prefix_search_fields = ('title',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
+class NotificationAdmin(LargeTableAdmin):
     list_display = ('user', 'message', 'is_read', 'created_at')
     list_filter = ('is_read', 'created_at')
-    search_fields = ('message',)
-    readonly_fields = ('created_at',)
+    list_select_related = ('user',)
+    search_fields = ('user__username',)
+    exact_search_fields = ('user__username',)
+    autocomplete_fields = ('user', 'task')
+    readonly_fields = ('archived_task', 'created_at')
 
 
 @admin.register(TaskComment)
-class TaskCommentAdmin(admin.ModelAdmin):
+class TaskCommentAdmin(LargeTableAdmin):
     list_display = ('task', 'user', 'created_at')
     list_filter = ('created_at',)
-    search_fields = ('text',)
+    list_select_related = ('task', 'user')
+    search_fields = ('user__username', 'task__slug')
+    exact_search_fields = ('user__username', 'task__slug')
+    autocomplete_fields = ('task', 'user')
     readonly_fields = ('created_at',)
+
+
+@admin.register(TaskEvent)
+class TaskEventAdmin(LargeTableAdmin):
+    list_display = ('id', 'task_id', 'kind', 'actor', 'created_at')
+    list_filter = ('kind',)
+    list_select_related = ('actor',)
+    raw_id_fields = ('actor',)
+    readonly_fields = ('task', 'actor', 'kind', 'data', 'created_at')
+
+
+@admin.register(ApiToken)
+class ApiTokenAdmin(admin.ModelAdmin):
+    list_display = ('prefix', 'user', 'name', 'scopes', 'created_at', 'expires_at', 'revoked_at')
+    list_filter = ('revoked_at',)
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    readonly_fields = ('key_hash', 'prefix', 'created_at')
+    actions = ['revoke']
+
+    @admin.action(description='Revoke selected tokens')
+    def revoke(self, request, queryset):
+        # Saved one by one so each token is evicted from the auth cache.
+        for token in queryset.filter(revoked_at__isnull=True):
+            token.revoked_at = timezone.now()
+            token.save(update_fields=['revoked_at'])
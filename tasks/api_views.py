@@ -6,24 +6,49 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
-from django.db.models import Q
+from datetime import date, timedelta
+
+from django.utils import timezone
 from django.utils.timesince import timesince
 
-from .models import Task, Notification
-from .serializers import TaskListSerializer, TaskCreateSerializer, TaskUpdateSerializer
-from .utils import user_can_edit_task, user_can_view_task, user_can_update_status
+from .models import Task, Notification, TaskChange, TaskEvent, DailyRollup, ConcurrentUpdate
+from .serializers import (
+    TaskListSerializer,
+    TaskCreateSerializer,
+    TaskUpdateSerializer,
+    TASK_LIST_FIELDS,
+    requested_fields,
+    narrow_task_queryset,
+    serialize_task_rows,
+)
+from .routers import replica_reads
+from .notification_cache import cached_notification_poll
+from .utils import (
+    user_can_edit_task,
+    user_can_view_task,
+    user_can_update_status,
+    record_event,
+    record_task_changes,
+    record_assignment_events,
+    get_read_watermark,
+    unread_notifications,
+    notification_is_read,
+    visible_tasks,
+    visible_archived_tasks,
+    calendar_entries,
+)
 
 
 def get_visible_tasks(user):
     """Tasks user owns or is assigned to (collaborator)."""
-    return Task.objects.filter(
-        Q(creator=user) | Q(assigned_users=user)
-    ).distinct().order_by('-created_at')
+    return visible_tasks(user)
 
 
+@replica_reads
 class TaskListCreateAPI(generics.ListCreateAPIView):
     """
-    GET: List tasks (owner or collaborator only).
+    GET: List tasks (owner or collaborator only). Archived tasks are left
+         out unless ?include_archived=1; they follow the live ones.
     POST: Create task (creator = request.user).
     """
     permission_classes = [IsAuthenticated]
@@ -36,8 +61,18 @@ class TaskListCreateAPI(generics.ListCreateAPIView):
     def get_queryset(self):
         return get_visible_tasks(self.request.user)
 
+    def list(self, request, *args, **kwargs):
+        # Read-only fast path: values() rows, no per-row serializer work.
+        fields = requested_fields(request, TASK_LIST_FIELDS)
+        data = serialize_task_rows(self.get_queryset(), fields)
+        if request.query_params.get('include_archived', '').lower() in ('1', 'true', 'yes'):
+            data += serialize_task_rows(visible_archived_tasks(request.user), fields)
+        return Response(data)
+
     def perform_create(self, serializer):
-        serializer.save()
+        task = serializer.save()
+        record_event(task, 'created', self.request.user)
+        record_assignment_events(task, self.request.user, serializer.assignment)
 
 
 class TaskDetailAPI(generics.RetrieveUpdateDestroyAPIView):
@@ -50,13 +85,21 @@ class TaskDetailAPI(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = TaskListSerializer
 
     def get_queryset(self):
-        return get_visible_tasks(self.request.user)
+        queryset = get_visible_tasks(self.request.user)
+        if self.request.method == 'GET':
+            queryset = narrow_task_queryset(queryset, requested_fields(self.request, TASK_LIST_FIELDS))
+        return queryset
 
     def get_serializer_class(self):
         if self.request.method in ('PUT', 'PATCH'):
             return TaskUpdateSerializer
         return TaskListSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        fields = requested_fields(request, TASK_LIST_FIELDS)
+        instance = self.get_object()
+        return Response(TaskListSerializer(instance, fields=fields).data)
+
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
@@ -65,7 +108,17 @@ class TaskDetailAPI(generics.RetrieveUpdateDestroyAPIView):
         if user_can_edit_task(request.user, instance):
             serializer = self.get_serializer(instance, data=request.data, partial=partial)
             serializer.is_valid(raise_exception=True)
-            serializer.save()
+            data = serializer.validated_data
+            changed = [
+                field for field, value in data.items()
+                if field not in ('assigned_users', 'version') and getattr(instance, field) != value
+            ]
+            try:
+                serializer.save()
+            except ConcurrentUpdate:
+                return self.conflict(instance)
+            record_task_changes(instance, request.user, changed)
+            record_assignment_events(instance, request.user, serializer.assignment)
             return Response(TaskListSerializer(instance).data)
         # Collaborator: update status only
         if not user_can_update_status(request.user, instance):
@@ -73,28 +126,60 @@ class TaskDetailAPI(generics.RetrieveUpdateDestroyAPIView):
         new_status = request.data.get('status')
         if new_status not in dict(Task.STATUS_CHOICES):
             return Response({'status': ['Invalid choice.']}, status=status.HTTP_400_BAD_REQUEST)
-        instance.status = new_status
-        instance.save()
+        if request.data.get('version') is not None:
+            try:
+                instance.expect_version(int(request.data['version']))
+            except (ValueError, TypeError):
+                return Response({'version': ['A valid integer is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        if instance.status != new_status:
+            instance.status = new_status
+            try:
+                instance.save()
+            except ConcurrentUpdate:
+                return self.conflict(instance)
+            record_event(instance, 'status', request.user, status=new_status)
         return Response(TaskListSerializer(instance).data)
 
+    def conflict(self, instance):
+        current = Task.objects.filter(pk=instance.pk).values_list('version', flat=True).first()
+        return Response(
+            {'detail': 'This task was changed by someone else. Reload it and retry.', 'version': current},
+            status=status.HTTP_409_CONFLICT,
+        )
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         if not user_can_edit_task(request.user, instance):
             return Response({'detail': 'Only the task owner can delete it.'}, status=status.HTTP_403_FORBIDDEN)
-        instance.delete()
+        instance.soft_delete(actor=request.user)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+# Not @replica_reads: the cached data must be at least as fresh as the
+# version it is stored under (see tasks.notification_cache).
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_notification_poll
 def notification_unread_count(request):
     """Get unread notification count for the current user."""
-    count = Notification.objects.filter(user=request.user, is_read=False).count()
+    count = unread_notifications(request.user).count()
     return Response({'count': count})
 
 
+NOTIFICATION_FIELDS = ['id', 'message', 'time', 'is_read', 'task_id']
+NOTIFICATION_FIELD_COLUMNS = {
+    'id': ['id'],
+    'message': ['message'],
+    'time': ['created_at'],
+    'is_read': ['is_read'],
+    'task_id': ['task_id', 'archived_task_id'],
+}
+
+
+# Primary reads too, like notification_unread_count.
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_notification_poll
 def notification_latest(request):
     """Get latest notifications since a given notification ID."""
     since_id = request.GET.get('since', 0)
@@ -103,19 +188,189 @@ def notification_latest(request):
     except (ValueError, TypeError):
         since_id = 0
     
+    fields = requested_fields(request, NOTIFICATION_FIELDS) or NOTIFICATION_FIELDS
+    watermark = get_read_watermark(request.user) if 'is_read' in fields else 0
+    columns = {'id', 'created_at'}
+    for name in fields:
+        columns.update(NOTIFICATION_FIELD_COLUMNS[name])
     notifications = Notification.objects.filter(
         user=request.user,
         id__gt=since_id
-    ).order_by('-created_at')[:10]
-    
+    ).order_by('-created_at').only(*columns)[:10]
+
     notification_list = []
     for n in notifications:
-        notification_list.append({
-            'id': n.id,
-            'message': n.message,
-            'time': timesince(n.created_at) + ' ago',
-            'is_read': n.is_read,
-            'task_id': n.task.id if n.task else None
-        })
-    
+        item = {}
+        for name in fields:
+            if name == 'time':
+                item[name] = timesince(n.created_at) + ' ago'
+            elif name == 'is_read':
+                item[name] = notification_is_read(n, watermark)
+            elif name == 'task_id':
+                item[name] = n.linked_task_id
+            else:
+                item[name] = getattr(n, name)
+        notification_list.append(item)
+
     return Response({'notifications': notification_list})
+
+
+@replica_reads
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def activity_feed(request):
+    """Task activity on the user's tasks with an id greater than ?since=, oldest first."""
+    try:
+        since_id = int(request.GET.get('since', 0))
+    except (ValueError, TypeError):
+        since_id = 0
+    try:
+        limit = min(max(int(request.GET.get('limit', 100)), 1), 500)
+    except (ValueError, TypeError):
+        limit = 100
+
+    # Addressed when recorded, so deletions and unassignments still arrive
+    # after the user has lost access to the task.
+    events = list(
+        TaskEvent.objects.filter(recipients__user=request.user, id__gt=since_id)
+        .order_by('id')
+        .values('id', 'task_id', 'actor_id', 'kind', 'data', 'created_at')[:limit]
+    )
+    return Response({
+        'events': events,
+        'next_since': events[-1]['id'] if events else since_id,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def task_sync(request):
+    """
+    Delta sync for offline clients. Returns tasks changed since ?cursor= (as
+    in the task list, ?fields= supported) and ids of tasks deleted or no
+    longer visible. Keep calling with the returned cursor while has_more.
+    A first sync (cursor 0) skips tombstones.
+    """
+    try:
+        cursor = max(int(request.GET.get('cursor', 0)), 0)
+    except (ValueError, TypeError):
+        cursor = 0
+    try:
+        limit = min(max(int(request.GET.get('limit', 200)), 1), 1000)
+    except (ValueError, TypeError):
+        limit = 200
+
+    changes = TaskChange.objects.filter(user=request.user, id__gt=cursor).order_by('id')
+    if cursor == 0:
+        changes = changes.filter(deleted=False)
+    changes = list(changes.values_list('id', 'task_id', 'deleted')[:limit + 1])
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    live_ids = [task_id for _, task_id, deleted in changes if not deleted]
+    fields = requested_fields(request, TASK_LIST_FIELDS)
+    if fields is not None and 'id' not in fields:
+        fields = ['id'] + fields
+    tasks = serialize_task_rows(Task.objects.filter(pk__in=live_ids).order_by('pk'), fields) if live_ids else []
+    # Anything deleted between reading the journal and the tasks is a tombstone too.
+    found = {task['id'] for task in tasks}
+    deleted = [task_id for _, task_id, deleted in changes if deleted or task_id not in found]
+
+    return Response({
+        'tasks': tasks,
+        'deleted': deleted,
+        'cursor': changes[-1][0] if changes else cursor,
+        'has_more': has_more,
+    })
+
+
+CALENDAR_MAX_DAYS = 366
+
+
+@replica_reads
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def task_calendar(request):
+    """
+    Tasks due between ?from= and ?to= (ISO dates, inclusive; default: the
+    next 30 days), with repeating tasks expanded into their future
+    occurrences. Those come back with virtual=true and the id of the
+    series' current task; nothing is written for them.
+    """
+    today = timezone.localdate()
+    try:
+        start = date.fromisoformat(request.GET['from']) if request.GET.get('from') else today
+        end = date.fromisoformat(request.GET['to']) if request.GET.get('to') else start + timedelta(days=29)
+    except ValueError:
+        return Response({'detail': 'from/to must be ISO dates (YYYY-MM-DD).'}, status=status.HTTP_400_BAD_REQUEST)
+    if start > end or (end - start).days >= CALENDAR_MAX_DAYS:
+        return Response(
+            {'detail': f'from must not be after to, and the range is limited to {CALENDAR_MAX_DAYS} days.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return Response({'from': start, 'to': end, 'entries': calendar_entries(request.user, start, end)})
+
+
+STATS_BUCKETS = ('day', 'week', 'month')
+STATS_MAX_DAYS = 3 * 366
+
+
+def bucket_start(day, bucket):
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start, bucket):
+    if bucket == 'week':
+        return start + timedelta(days=7)
+    if bucket == 'month':
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+@replica_reads
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def stats_timeseries(request):
+    """
+    Created / completed / overdue counts per ?bucket= (day, week or month)
+    between ?from= and ?to= (ISO dates, inclusive; default: the last 30 days).
+    Read from the DailyRollup table only; empty buckets are filled with zeros.
+    """
+    bucket = request.GET.get('bucket', 'day')
+    if bucket not in STATS_BUCKETS:
+        return Response({'bucket': [f'Must be one of: {", ".join(STATS_BUCKETS)}.']}, status=status.HTTP_400_BAD_REQUEST)
+    today = timezone.localdate()
+    try:
+        end = date.fromisoformat(request.GET['to']) if request.GET.get('to') else today
+        start = date.fromisoformat(request.GET['from']) if request.GET.get('from') else end - timedelta(days=29)
+    except ValueError:
+        return Response({'detail': 'from/to must be ISO dates (YYYY-MM-DD).'}, status=status.HTTP_400_BAD_REQUEST)
+    if start > end or (end - start).days >= STATS_MAX_DAYS:
+        return Response(
+            {'detail': f'from must not be after to, and the range is limited to {STATS_MAX_DAYS} days.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    buckets = {}
+    current = bucket_start(start, bucket)
+    while current <= end:
+        buckets[current] = dict.fromkeys(DailyRollup.COUNTERS, 0)
+        current = next_bucket(current, bucket)
+    rows = DailyRollup.objects.filter(user=request.user, day__gte=start, day__lte=end).values_list(
+        'day', *DailyRollup.COUNTERS
+    )
+    for day, *values in rows:
+        totals = buckets[bucket_start(day, bucket)]
+        for counter, value in zip(DailyRollup.COUNTERS, values):
+            totals[counter] += value
+
+    return Response({
+        'bucket': bucket,
+        'from': start,
+        'to': end,
+        'series': [{'start': key, **totals} for key, totals in buckets.items()],
+    })
@@ -0,0 +1,77 @@
+"""
+Assignment service: the one place a task's assignees are changed.
+Callers resolve usernames (or validate ids) once, then assign_users() diffs
+the wanted ids against the current ones in memory and touches only the
+through-table rows that changed. add()/remove() are used rather than raw
+through-table writes so the m2m_changed handlers keep TaskAccess and the
+sync journal current. The returned AssignmentDiff tells the caller whom to
+notify without another lookup.
+"""
+from dataclasses import dataclass
+
+from django.contrib.auth.models import User
+
+from .models import Task
+
+
+@dataclass(frozen=True)
+class AssignmentDiff:
+    added: tuple = ()
+    removed: tuple = ()
+
+    def __bool__(self):
+        return bool(self.added or self.removed)
+
+
+def parse_usernames(raw):
+    """'alice, bob' (or a list) -> ['alice', 'bob'], blanks and duplicates dropped."""
+    if isinstance(raw, (list, tuple)):
+        names = [str(name).strip() for name in raw if name]
+    else:
+        names = [name.strip() for name in (raw or '').split(',')]
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def current_assignees(task):
+    """{user_id: username} of the task's assignees (one query; none for an unsaved task)."""
+    if task.pk is None:
+        return {}
+    return dict(
+        Task.assigned_users.through.objects.filter(task_id=task.pk)
+        .values_list('user_id', 'user__username')
+    )
+
+
+def resolve_usernames(usernames, known=None):
+    """
+    ({username: user_id}, [missing usernames]). Names already in `known`
+    ({user_id: username}, e.g. the current assignees) are not queried again.
+    """
+    by_name = {name: user_id for user_id, name in (known or {}).items()}
+    resolved = {name: by_name[name] for name in usernames if name in by_name}
+    unknown = [name for name in usernames if name not in resolved]
+    if unknown:
+        resolved.update(User.objects.filter(username__in=unknown).values_list('username', 'pk'))
+    return resolved, [name for name in usernames if name not in resolved]
+
+
+def validate_user_ids(user_ids):
+    """The ids (deduplicated, in order) and those that don't exist, with one query."""
+    user_ids = list(dict.fromkeys(user_ids))
+    found = set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True)) if user_ids else set()
+    return user_ids, [user_id for user_id in user_ids if user_id not in found]
+
+
+def assign_users(task, user_ids, current=None):
+    """
+    Make `user_ids` the task's assignees. `current` is the existing set of
+    ids if the caller already has it (pass () for a new task).
+    """
+    current = set(current_assignees(task) if current is None else current)
+    wanted = set(user_ids)
+    diff = AssignmentDiff(added=tuple(sorted(wanted - current)), removed=tuple(sorted(current - wanted)))
+    if diff.removed:
+        task.assigned_users.remove(*diff.removed)
+    if diff.added:
+        task.assigned_users.add(*diff.added)
+    return diff
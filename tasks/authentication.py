@@ -0,0 +1,157 @@
+"""
+Token authentication for API clients.
+Clients send `Authorization: Bearer <token>`. Tokens are random, so a single
+SHA-256 digest (not a slow password hash) identifies them. Validated tokens
+are kept in a small in-process LRU for API_TOKEN_CACHE_TTL seconds; saving or
+deleting a token (e.g. revoking it) evicts it from this process's cache
+immediately, other processes pick it up when their entry expires.
+"""
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+from .models import ApiToken
+
+TOKEN_PREFIX = 'tdo_'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def hash_token(raw):
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def issue_token(user, scopes=('read', 'write'), expires_at=None, name=''):
+    """Create a token for `user`; returns (ApiToken, raw token). The raw value is not stored."""
+    raw = TOKEN_PREFIX + secrets.token_urlsafe(32)
+    token = ApiToken.objects.create(
+        user=user,
+        name=name,
+        key_hash=hash_token(raw),
+        prefix=raw[:len(TOKEN_PREFIX) + 6],
+        scopes=' '.join(sorted(set(scopes))),
+        expires_at=expires_at,
+    )
+    return token, raw
+
+
+@dataclass(frozen=True)
+class ValidatedToken:
+    """What request.auth holds for token-authenticated requests."""
+    token_id: int
+    key_hash: str
+    scopes: frozenset
+    expires_at: object
+
+
+class TokenCache:
+    """Thread-safe LRU of validated tokens with a short TTL."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key_hash):
+        with self._lock:
+            entry = self._entries.get(key_hash)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key_hash]
+                return None
+            self._entries.move_to_end(key_hash)
+            return entry[1]
+
+    def set(self, key_hash, value):
+        with self._lock:
+            self._entries[key_hash] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key_hash)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key_hash):
+        with self._lock:
+            self._entries.pop(key_hash, None)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key_hash in [k for k, (_, (user, _)) in self._entries.items() if user.pk == user_id]:
+                del self._entries[key_hash]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(
+    maxsize=getattr(settings, 'API_TOKEN_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'API_TOKEN_CACHE_TTL', 30),
+)
+
+
+class TokenAuthentication(BaseAuthentication):
+    """`Authorization: Bearer <token>` (or `Token <token>`) with scope checks."""
+    keywords = (b'bearer', b'token')
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() not in self.keywords:
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+        try:
+            raw = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+
+        key_hash = hash_token(raw)
+        cached = token_cache.get(key_hash)
+        if cached is None:
+            cached = self.load(key_hash)
+            token_cache.set(key_hash, cached)
+        user, validated = cached
+        if validated.expires_at is not None and validated.expires_at <= timezone.now():
+            token_cache.invalidate(key_hash)
+            raise exceptions.AuthenticationFailed('Token has expired.')
+
+        needed = 'read' if request.method in SAFE_METHODS else 'write'
+        if needed not in validated.scopes:
+            raise exceptions.PermissionDenied(f'This token lacks the "{needed}" scope.')
+        return user, validated
+
+    def load(self, key_hash):
+        try:
+            token = ApiToken.objects.select_related('user').get(key_hash=key_hash)
+        except ApiToken.DoesNotExist:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+        if not token.is_active:
+            raise exceptions.AuthenticationFailed('Token has expired or been revoked.')
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        return token.user, ValidatedToken(token.pk, key_hash, token.scope_set, token.expires_at)
+
+    def authenticate_header(self, request):
+        return 'Bearer'
+
+
+# Registered with the cache itself: nothing can be cached before this module loads.
+@receiver([post_save, post_delete], sender=ApiToken)
+def evict_token(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key_hash)
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def evict_user_tokens(sender, instance, **kwargs):
+    # e.g. a deactivated user or a changed password
+    token_cache.invalidate_user(instance.pk)
@@ -0,0 +1,85 @@
+"""
+Online copies of the SQLite database.
+online_backup() drives SQLite's backup API a few pages at a time and sleeps
+between steps. The source is only read-locked while a step runs, so writers
+are held up for at most one step instead of the whole copy. If another
+connection writes mid-copy SQLite restarts the backup from the first page.
+Under a steady write load that can go on forever, so after `max_restarts`
+the rest is copied in a single step (one longer lock, reported as the
+longest stall).
+"""
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass
+class BackupStats:
+    pages: int = 0
+    steps: int = 0
+    restarts: int = 0
+    # True when too many restarts forced a single-step copy.
+    single_step: bool = False
+    elapsed: float = 0.0
+    # The longest single step: the most a writer could have waited on us.
+    longest_step: float = 0.0
+
+    @property
+    def pages_per_second(self):
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+
+def _read_only(path):
+    return sqlite3.connect(Path(path).resolve().as_uri() + '?mode=ro', uri=True)
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def online_backup(source_path, target_path, pages=256, pause=0.01, max_restarts=3):
+    """Copy the database at `source_path` to `target_path`; returns BackupStats."""
+    stats = BackupStats()
+    source = _read_only(source_path)
+    target = sqlite3.connect(str(target_path))
+    remaining_before = None
+    step_started = time.perf_counter()
+
+    def progress(status, remaining, total):
+        nonlocal remaining_before, step_started
+        stats.longest_step = max(stats.longest_step, time.perf_counter() - step_started)
+        stats.steps += 1
+        stats.pages = total
+        if remaining_before is not None and remaining > remaining_before:
+            stats.restarts += 1
+            if stats.restarts > max_restarts:
+                raise _TooManyRestarts
+        remaining_before = remaining
+        if remaining:
+            time.sleep(pause)
+        step_started = time.perf_counter()
+
+    started = time.perf_counter()
+    try:
+        try:
+            source.backup(target, pages=pages, progress=progress)
+        except _TooManyRestarts:
+            stats.single_step = True
+            step_started = time.perf_counter()
+            source.backup(target, pages=-1, progress=progress)
+    finally:
+        target.close()
+        source.close()
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def integrity_errors(path):
+    """Problems PRAGMA integrity_check finds in the database at `path` ([] when it's sound)."""
+    connection = _read_only(path)
+    try:
+        rows = [row[0] for row in connection.execute('PRAGMA integrity_check')]
+    finally:
+        connection.close()
+    return [] if rows == ['ok'] else rows
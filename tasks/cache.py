@@ -0,0 +1,101 @@
+"""
+Namespaced cache helpers for the tasks app.
+Keys look like `tasks:<namespace>:<part>:<part>` so different features can't
+collide, and every lookup is counted per namespace (see cache_stats()) so
+hit rates show up in profiles and the admin profiles page.
+"""
+import threading
+from collections import defaultdict
+
+from django.core.cache import caches
+
+KEY_PREFIX = 'tasks'
+_MISSING = object()
+
+_stats = defaultdict(lambda: {'hits': 0, 'misses': 0})
+_stats_lock = threading.Lock()
+
+
+def _count(namespace, outcome):
+    with _stats_lock:
+        _stats[namespace][outcome] += 1
+
+
+def cache_stats():
+    """Hit/miss counts per namespace for this process."""
+    with _stats_lock:
+        return {namespace: dict(counts) for namespace, counts in _stats.items()}
+
+
+class NamespacedCache:
+    """
+    Thin wrapper around one Django cache alias.
+    `alias='default'` is per-process (locmem); use `alias='shared'` for data
+    every worker process must agree on. 'shared' is file-based unless Redis
+    is configured, so don't count on atomic read-modify-write there (its
+    incr is a get + set).
+    """
+
+    def __init__(self, namespace, alias='default', timeout=300):
+        self.namespace = namespace
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def key(self, *parts):
+        return ':'.join([KEY_PREFIX, self.namespace, *map(str, parts)])
+
+    def get(self, *parts, default=None):
+        value = self.backend.get(self.key(*parts), _MISSING)
+        if value is _MISSING:
+            _count(self.namespace, 'misses')
+            return default
+        _count(self.namespace, 'hits')
+        return value
+
+    def set(self, *parts, value, timeout=None):
+        self.backend.set(self.key(*parts), value, self.timeout if timeout is None else timeout)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Per-process request coalescing: while one thread computes `key`, other
+    threads asking for the same key wait for its result instead of
+    repeating the work (a cache miss under a stampede costs one query).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def do(self, key, compute):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = compute()
+        except Exception as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.value
@@ -1,10 +1,19 @@
-from .models import Notification, Profile
+from .models import Profile
+from .utils import unread_notifications
+
+
+def _get_profile(request):
+    """Load the user's profile once per request for both context processors."""
+    if not hasattr(request, '_cached_profile'):
+        request._cached_profile, _ = Profile.objects.get_or_create(user=request.user)
+    return request._cached_profile
 
 
 def notification_count(request):
     """Add unread notification count to template context."""
     if request.user.is_authenticated:
-        count = Notification.objects.filter(user=request.user, is_read=False).count()
+        watermark = _get_profile(request).last_read_notification_id
+        count = unread_notifications(request.user, watermark).count()
         return {'unread_notification_count': count}
     return {'unread_notification_count': 0}
 
@@ -12,6 +21,5 @@ def notification_count(request):
 def user_profile(request):
     """Add current user's profile (with avatar) to template context."""
     if request.user.is_authenticated:
-        profile, _ = Profile.objects.get_or_create(user=request.user)
-        return {'user_profile': profile}
+        return {'user_profile': _get_profile(request)}
     return {'user_profile': None}
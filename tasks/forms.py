@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User
 from .models import Task, Profile, TaskComment
+from .assignment import AssignmentDiff, assign_users, current_assignees, parse_usernames, resolve_usernames
 
 
 class UserRegistrationForm(forms.ModelForm):
@@ -44,12 +45,18 @@ class TaskForm(forms.ModelForm):
         label='Assign to users',
         help_text='Type usernames separated by commas (e.g. alice, bob)'
     )
+    # Version the form was rendered from; saving a task changed since then fails.
+    version = forms.IntegerField(widget=forms.HiddenInput, required=False)
 
     class Meta:
         model = Task
-        fields = ('title', 'description', 'status', 'priority', 'due_date')
+        fields = (
+            'title', 'description', 'status', 'priority', 'due_date',
+            'recurrence', 'recurrence_until', 'recurrence_count',
+        )
         widgets = {
             'due_date': forms.DateInput(attrs={'type': 'date'}),
+            'recurrence_until': forms.DateInput(attrs={'type': 'date'}),
             'description': forms.Textarea(attrs={'rows': 4}),
         }
 
@@ -57,49 +64,57 @@ class TaskForm(forms.ModelForm):
         self.creator = kwargs.pop('creator', None)
         initial = kwargs.get('initial', {})
         instance = kwargs.get('instance')
-        if instance and instance.pk:
-            usernames = list(instance.assigned_users.values_list('username', flat=True))
-            initial['assigned_usernames'] = ', '.join(usernames)
+        # Loaded once: the field's initial value and the baseline save() diffs against.
+        self.current_assignees = current_assignees(instance) if instance is not None else {}
+        if self.current_assignees:
+            initial['assigned_usernames'] = ', '.join(self.current_assignees.values())
+        if instance is not None and instance.pk:
+            initial['version'] = instance.version
         kwargs['initial'] = initial
         super().__init__(*args, **kwargs)
+        self.assignment = AssignmentDiff()
 
     def clean_assigned_usernames(self):
-        raw = self.cleaned_data.get('assigned_usernames', '')
-        if isinstance(raw, list):
-            usernames = [str(u).strip() for u in raw if u]
-        else:
-            raw = (raw or '').strip()
-            usernames = [u.strip() for u in raw.split(',') if u.strip()]
+        """Resolved to user ids."""
+        usernames = parse_usernames(self.cleaned_data.get('assigned_usernames', ''))
         if not usernames:
             return []
-        found = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
-        missing = set(usernames) - found
+        resolved, missing = resolve_usernames(usernames, known=self.current_assignees)
         if missing:
             raise forms.ValidationError(f'User(s) not found: {", ".join(missing)}')
-        return list(found)
+        return list(resolved.values())
 
     def save(self, commit=True):
         task = super().save(commit=False)
         if self.creator:
             task.creator = self.creator
+        if self.cleaned_data.get('version'):
+            task.expect_version(self.cleaned_data['version'])
         if commit:
             task.save()
-            usernames = self.cleaned_data.get('assigned_usernames', [])
-            if usernames:
-                users = User.objects.filter(username__in=usernames)
-                task.assigned_users.set(users)
-            else:
-                task.assigned_users.clear()
+            self.assignment = assign_users(
+                task, self.cleaned_data.get('assigned_usernames', []), current=self.current_assignees
+            )
         return task
 
 
 class TaskStatusForm(forms.ModelForm):
     """Minimal form for assigned users to update status only."""
+    version = forms.IntegerField(widget=forms.HiddenInput, required=False)
 
     class Meta:
         model = Task
         fields = ('status',)
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['version'].initial = self.instance.version
+
+    def save(self, commit=True):
+        if self.cleaned_data.get('version'):
+            self.instance.expect_version(self.cleaned_data['version'])
+        return super().save(commit)
+
 
 class UserUpdateForm(forms.ModelForm):
     email = forms.EmailField(required=False)
@@ -0,0 +1,67 @@
+"""
+URL patterns whose views are imported on first use.
+lazy_path('api/...', 'tasks.api_views.task_sync', name=...) works like
+path() but doesn't import the view module (and whatever it drags in, e.g.
+DRF and the serializers) until a request is routed to it, so loading the
+URLconf stays cheap for a freshly started worker. Attribute lookups are
+passed through to the real view, so middleware still sees csrf_exempt,
+replica_reads, view_class and the like. tasks.warmup imports them all up
+front when a worker is warmed before taking traffic.
+"""
+import threading
+
+from django.urls.resolvers import RoutePattern, URLPattern
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+
+class LazyView:
+    """A view callable resolved from its dotted path on first call or attribute access."""
+
+    def __init__(self, dotted_path):
+        self.dotted_path = dotted_path
+        self._view = None
+        self._lock = threading.Lock()
+
+    def resolve(self):
+        if self._view is None:
+            with self._lock:
+                if self._view is None:
+                    view = import_string(self.dotted_path)
+                    # Class-based views are given by class; route to as_view().
+                    self._view = view.as_view() if hasattr(view, 'as_view') else view
+        return self._view
+
+    def __call__(self, request, *args, **kwargs):
+        return self.resolve()(request, *args, **kwargs)
+
+    def __getattr__(self, name):
+        # Only reached for attributes LazyView itself doesn't have (or, while
+        # copying, doesn't have yet).
+        if name in ('dotted_path', '_view', '_lock'):
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+    def __repr__(self):
+        return f'<LazyView {self.dotted_path}>'
+
+
+class LazyURLPattern(URLPattern):
+    @cached_property
+    def lookup_str(self):
+        # URLPattern's version inspects the callback, which would import it
+        # as soon as anything calls reverse().
+        return self.callback.dotted_path
+
+
+def lazy_path(route, dotted_path, kwargs=None, name=None):
+    return LazyURLPattern(RoutePattern(route, name=name, is_endpoint=True), LazyView(dotted_path), kwargs or {}, name)
+
+
+def lazy_views(patterns):
+    """Every LazyView in `patterns` (recursing into includes)."""
+    for pattern in patterns:
+        if isinstance(pattern, LazyURLPattern):
+            yield pattern.callback
+        elif hasattr(pattern, 'url_patterns'):
+            yield from lazy_views(pattern.url_patterns)
@@ -0,0 +1,73 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from tasks.models import (
+    Task, TaskComment, Notification, ArchivedTask, ArchivedAssignment, ArchivedTaskComment,
+)
+from tasks.notification_cache import bump_notification_versions
+
+ARCHIVED_FIELDS = [field.attname for field in ArchivedTask._meta.concrete_fields if field.attname != 'archived_at']
+
+
+class Command(BaseCommand):
+    help = (
+        'Move tasks completed more than --days ago, with their comments and assignments, '
+        'into the archive tables. Works in --batch-size transactions; safe to interrupt and re-run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument(
+            '--pause', type=float, default=0.05,
+            help='Seconds to sleep between batches so other writers get the lock.',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        candidates = Task.objects.filter(status='completed', completed_at__lt=cutoff).order_by('pk')
+        last_pk = 0
+        total = 0
+        while True:
+            ids = list(candidates.filter(pk__gt=last_pk).values_list('pk', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            last_pk = ids[-1]
+            total += self.archive(ids)
+            self.stdout.write(f'  {total} task(s) archived')
+            time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {total} task(s) completed before {cutoff:%Y-%m-%d}.'
+        ))
+
+    @transaction.atomic
+    def archive(self, ids):
+        """Copy one batch into the archive tables and delete it from the live ones."""
+        rows = Task.objects.filter(pk__in=ids).values(*ARCHIVED_FIELDS)
+        archived = ArchivedTask.objects.bulk_create([ArchivedTask(**row) for row in rows])
+        ids = [task.pk for task in archived]
+        ArchivedAssignment.objects.bulk_create([
+            ArchivedAssignment(task_id=task_id, user_id=user_id)
+            for task_id, user_id in Task.assigned_users.through.objects.filter(task_id__in=ids)
+            .values_list('task_id', 'user_id')
+        ])
+        comments = TaskComment.objects.filter(task_id__in=ids).order_by().values(
+            'id', 'task_id', 'user_id', 'text', 'created_at'
+        )
+        ArchivedTaskComment.objects.bulk_create(
+            (ArchivedTaskComment(**row) for row in comments.iterator()), batch_size=500
+        )
+        # Notifications move over to the archived row; the delete below
+        # would cascade to them.
+        notifications = Notification.objects.filter(task_id__in=ids)
+        bump_notification_versions(notifications.order_by().values_list('user_id', flat=True).distinct())
+        notifications.update(archived_task_id=F('task_id'), task=None)
+        # Comments, assignments and access rows cascade; the pre_delete handler
+        # tombstones the task in its viewers' sync journals.
+        Task.all_objects.filter(pk__in=ids).delete()
+        return len(ids)
@@ -0,0 +1,75 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+from tasks.models import Task, TaskAccess, DailyRollup
+
+
+def rollup_counts(tasks, access):
+    """
+    {(user_id, day): {counter: n}} rebuilt from live `tasks` and their
+    `access` rows. Takes querysets so migrations can pass historical models.
+    """
+    counts = defaultdict(dict)
+    created = (
+        tasks.annotate(day=TruncDate('created_at'))
+        .values_list('creator_id', 'day').annotate(n=Count('id'))
+    )
+    for user_id, day, n in created:
+        counts[user_id, day]['created'] = n
+    completed = (
+        access.filter(task__status='completed', task__completed_at__isnull=False)
+        .annotate(day=TruncDate('task__completed_at'))
+        .values_list('user_id', 'day').annotate(n=Count('id'))
+    )
+    for user_id, day, n in completed:
+        counts[user_id, day]['completed'] = n
+    overdue = (
+        access.filter(task__due_state='overdue', task__due_date__isnull=False)
+        .values_list('user_id', 'task__due_date').annotate(n=Count('id'))
+    )
+    for user_id, due_date, n in overdue:
+        day = due_date + timedelta(days=1)
+        counts[user_id, day]['overdue'] = counts[user_id, day].get('overdue', 0) + n
+    return counts
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the DailyRollup counters from the task table. Completions are dated by '
+        'completed_at; tasks that are overdue now count as going overdue the day after '
+        'their due date (the exact day is not recorded anywhere else).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild this username\'s rollups.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        tasks = Task.objects.order_by()
+        access = TaskAccess.objects.filter(task__deleted_at__isnull=True).order_by()
+        rollups = DailyRollup.objects.all()
+        if options['user']:
+            try:
+                user = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f'No user named "{options["user"]}".')
+            tasks = tasks.filter(creator=user)
+            access = access.filter(user=user)
+            rollups = rollups.filter(user=user)
+
+        counts = rollup_counts(tasks, access)
+        with transaction.atomic():
+            deleted, _ = rollups.delete()
+            DailyRollup.objects.bulk_create(
+                [DailyRollup(user_id=user_id, day=day, **values) for (user_id, day), values in counts.items()],
+                batch_size=options['batch_size'],
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Replaced {deleted} rollup row(s) with {len(counts)}.'
+        ))
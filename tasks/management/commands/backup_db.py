@@ -0,0 +1,77 @@
+import gzip
+import os
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from tasks.backup import integrity_errors, online_backup
+
+SNAPSHOT_PREFIX = 'db-'
+
+
+class Command(BaseCommand):
+    help = (
+        'Snapshot the SQLite database while the site is running, using the online backup '
+        'API in small steps. The copy is checked with PRAGMA integrity_check before it is '
+        'kept; older snapshots beyond --keep are removed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--output-dir', help='Defaults to the BACKUP_DIR setting.')
+        parser.add_argument('--pages', type=int, default=256, help='Pages copied per step.')
+        parser.add_argument('--pause', type=float, default=0.01, help='Seconds to sleep between steps.')
+        parser.add_argument('--gzip', action='store_true', help='Compress the snapshot.')
+        parser.add_argument('--keep', type=int, default=7, help='Snapshots to keep (0 keeps all).')
+
+    def handle(self, *args, **options):
+        db = connections[options['database']].settings_dict
+        if db['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('backup_db only supports SQLite databases.')
+        output_dir = Path(options['output_dir'] or getattr(settings, 'BACKUP_DIR', settings.BASE_DIR / 'backups'))
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        name = f'{SNAPSHOT_PREFIX}{timezone.now():%Y%m%d-%H%M%S}.sqlite3'
+        # Written under .partial names and renamed once complete and verified.
+        copy = output_dir / f'{name}.partial'
+        compressed = output_dir / f'{name}.gz.partial'
+        try:
+            stats = online_backup(db['NAME'], copy, pages=options['pages'], pause=options['pause'])
+            errors = integrity_errors(copy)
+            if errors:
+                raise CommandError('Snapshot failed integrity_check: ' + '; '.join(errors[:5]))
+            if options['gzip']:
+                with open(copy, 'rb') as src, gzip.open(compressed, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                name += '.gz'
+                os.replace(compressed, output_dir / name)
+            else:
+                os.replace(copy, output_dir / name)
+        finally:
+            copy.unlink(missing_ok=True)
+            compressed.unlink(missing_ok=True)
+
+        size = (output_dir / name).stat().st_size
+        self.stdout.write(
+            f'  {stats.pages} pages in {stats.steps} steps, {stats.elapsed:.2f}s '
+            f'({stats.pages_per_second:,.0f} pages/s), longest writer stall {stats.longest_step * 1000:.1f} ms, '
+            f'{stats.restarts} restart(s)' + (', finished in a single step' if stats.single_step else '')
+        )
+        removed = self.rotate(output_dir, options['keep'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {output_dir / name} ({size / 1024 / 1024:.1f} MB, integrity ok); removed {removed} old snapshot(s).'
+        ))
+
+    def rotate(self, output_dir, keep):
+        if keep <= 0:
+            return 0
+        snapshots = sorted(
+            path for path in output_dir.glob(f'{SNAPSHOT_PREFIX}*.sqlite3*') if not path.name.endswith('.partial')
+        )
+        for path in snapshots[:-keep]:
+            path.unlink()
+        return max(len(snapshots) - keep, 0)
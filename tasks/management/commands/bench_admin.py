@@ -0,0 +1,91 @@
+import time
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from tasks.models import Task, Notification, TaskComment, TaskEvent
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Load each tasks admin changelist at a small and a large table size and report '
+        'queries and time. Fails if any changelist\'s query count grows with the table. '
+        'Runs in a rolled-back transaction.'
+    )
+    models = [Task, Notification, TaskComment, TaskEvent]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--small', type=int, default=20, help='Tasks at the small scale.')
+        parser.add_argument('--large', type=int, default=5000, help='Tasks at the large scale.')
+
+    def handle(self, *args, **options):
+        results = {}
+        try:
+            with transaction.atomic():
+                self.superuser = User.objects.create_superuser('bench-admin', 'bench@example.com', None)
+                self.users = [User.objects.create_user(f'bench-user-{i}') for i in range(20)]
+                seeded = 0
+                for scale in (options['small'], options['large']):
+                    self.seed(seeded, scale)
+                    seeded = scale
+                    results[scale] = {model: self.load(model) for model in self.models}
+                raise Rollback
+        except Rollback:
+            pass
+
+        small, large = options['small'], options['large']
+        self.stdout.write(f'  {"changelist":<16}' + ''.join(
+            f'{f"queries @{scale}":>16}{f"ms @{scale}":>12}' for scale in (small, large)
+        ))
+        growing = []
+        for model in self.models:
+            row = f'  {model._meta.model_name:<16}'
+            for scale in (small, large):
+                queries, seconds = results[scale][model]
+                row += f'{queries:>16}{seconds * 1000:>12.1f}'
+            self.stdout.write(row)
+            if results[large][model][0] != results[small][model][0]:
+                growing.append(model._meta.model_name)
+        if growing:
+            raise CommandError(f'Query count grows with table size for: {", ".join(growing)}')
+        self.stdout.write(self.style.SUCCESS('Query counts are constant across scales.'))
+
+    def seed(self, start, stop):
+        """Add tasks start..stop, each with two assignees, notifications, a comment and an event."""
+        tasks = Task.objects.bulk_create([
+            Task(title=f'Bench task {i}', slug=f'bench-task-{i}', creator=self.users[i % len(self.users)])
+            for i in range(start, stop)
+        ])
+        Task.assigned_users.through.objects.bulk_create([
+            Task.assigned_users.through(task_id=task.pk, user_id=self.users[(task.pk + k) % len(self.users)].pk)
+            for task in tasks for k in (1, 2)
+        ])
+        Notification.objects.bulk_create([
+            Notification(user=self.users[(task.pk + k) % len(self.users)], task=task, message=f'Assigned to {task.title}')
+            for task in tasks for k in (1, 2)
+        ])
+        TaskComment.objects.bulk_create([
+            TaskComment(task=task, user=self.users[task.pk % len(self.users)], text='Looks good') for task in tasks
+        ])
+        TaskEvent.objects.bulk_create([
+            TaskEvent(task_id=task.pk, actor=task.creator, kind='created') for task in tasks
+        ])
+
+    def load(self, model):
+        """(queries, seconds) to build and render the first changelist page."""
+        model_admin = admin.site._registry[model]
+        request = RequestFactory().get(f'/admin/tasks/{model._meta.model_name}/')
+        request.user = self.superuser
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            model_admin.changelist_view(request).render()
+            elapsed = time.perf_counter() - start
+        return len(queries), elapsed
@@ -0,0 +1,89 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter per sample: import the WSGI app as a server
+# would, then time the first and second request to each path in-process.
+SCRIPT = '''
+import io, json, sys, time
+started = time.perf_counter()
+from todo.wsgi import application
+result = {'ready': time.perf_counter() - started, 'requests': []}
+
+def get(path):
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost', 'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+        'wsgi.multithread': False, 'wsgi.multiprocess': True, 'wsgi.run_once': False,
+    }
+    statuses = []
+    begun = time.perf_counter()
+    body = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    b''.join(body)
+    getattr(body, 'close', lambda: None)()
+    return statuses[0].split()[0], time.perf_counter() - begun
+
+for path in sys.argv[1:]:
+    status, first = get(path)
+    result.setdefault('first_response', time.perf_counter() - started)
+    _, second = get(path)
+    result['requests'].append([path, status, first, second])
+print(json.dumps(result))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure time to first response of a freshly started worker: import todo.wsgi in a '
+        'new interpreter, then time the first and second request to each --path. Compares '
+        'a plain start with one using the warm-up hook (TODO_WARMUP=1).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Request path, repeatable (default: /login/ and /api/notifications/unread-count/).',
+        )
+        parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per mode.')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or ['/login/', '/api/notifications/unread-count/']
+        self.stdout.write(f'  {"start":<10}{"ready ms":>10}' + ''.join(
+            f'{f"{path} 1st/2nd ms":>{max(len(path) + 14, 24)}}' for path in paths
+        ) + f'{"start to 1st response ms":>27}')
+        for label, warm in (('plain', '0'), ('warm-up', '1')):
+            samples = [self.sample(paths, warm) for _ in range(options['runs'])]
+            row = f'  {label:<10}{self.median(samples, lambda s: s["ready"]):>10.1f}'
+            for index, path in enumerate(paths):
+                first = self.median(samples, lambda s: s['requests'][index][2])
+                second = self.median(samples, lambda s: s['requests'][index][3])
+                row += f'{f"{first:.1f} / {second:.1f}":>{max(len(path) + 14, 24)}}'
+            row += f'{self.median(samples, lambda s: s["first_response"]):>27.1f}'
+            self.stdout.write(row)
+        self.stdout.write(self.style.SUCCESS(
+            f'Medians of {options["runs"]} run(s) per mode; statuses: '
+            + ', '.join(f'{path} {status}' for path, status, *_ in samples[-1]['requests'])
+        ))
+
+    def sample(self, paths, warm):
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'todo.settings'),
+            'TODO_WARMUP': warm,
+        }
+        result = subprocess.run(
+            [sys.executable, '-c', SCRIPT, *paths], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f'Worker failed:\n{result.stderr[-2000:]}')
+        return json.loads(result.stdout.splitlines()[-1])
+
+    def median(self, samples, value):
+        return statistics.median(value(sample) for sample in samples) * 1000
@@ -0,0 +1,80 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from tasks.models import Task, TaskAccess
+from tasks.renderers import FastJSONRenderer, orjson
+from tasks.serializers import TaskListSerializer, narrow_task_queryset, serialize_task_rows
+from tasks.utils import visible_tasks
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Time task list serialization per 1,000 tasks: ModelSerializer vs the values() '
+        'fast path, stdlib JSON vs orjson, full vs sparse fields. Runs in a rolled-back transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1000)
+        parser.add_argument('--assignees', type=int, default=2)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['tasks'], options['assignees'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, count, assignees, repeat):
+        owner = User.objects.create_user('bench-owner')
+        helpers = [User.objects.create_user(f'bench-helper-{i}') for i in range(assignees)]
+        tasks = Task.objects.bulk_create([
+            Task(title=f'Bench task {i}', slug=f'bench-task-{i}', description='x' * 500, creator=owner)
+            for i in range(count)
+        ])
+        Task.assigned_users.through.objects.bulk_create([
+            Task.assigned_users.through(task_id=task.pk, user_id=helper.pk)
+            for task in tasks for helper in helpers
+        ])
+        TaskAccess.objects.bulk_create([
+            TaskAccess(user=owner, task=task, role='owner', task_created_at=task.created_at) for task in tasks
+        ])
+        queryset = visible_tasks(owner)
+        sparse = ['id', 'title', 'status', 'due_date']
+
+        builders = [
+            ('ModelSerializer', lambda: TaskListSerializer(queryset, many=True).data),
+            ('fast path', lambda: serialize_task_rows(queryset)),
+            ('ModelSerializer, sparse + .only()', lambda: TaskListSerializer(
+                narrow_task_queryset(queryset, sparse), many=True, fields=sparse
+            ).data),
+            ('fast path, sparse', lambda: serialize_task_rows(queryset, sparse)),
+        ]
+        renderers = [('stdlib json', JSONRenderer()), ('fast renderer', FastJSONRenderer())]
+
+        self.stdout.write(f'{count} tasks, {assignees} assignees each, best of {repeat}, '
+                          f'ms per 1,000 tasks; orjson {"available" if orjson else "not installed"}')
+        self.stdout.write(f'  {"serializer (incl. query)":<36}{"build":>9}' + ''.join(f'{name:>15}' for name, _ in renderers))
+        per_thousand = 1000 * 1000 / count
+        for label, build in builders:
+            build_time = min(self.timed(build) for _ in range(repeat))
+            data = build()
+            render_times = [min(self.timed(lambda: renderer.render(data)) for _ in range(repeat)) for _, renderer in renderers]
+            self.stdout.write(
+                f'  {label:<36}{build_time * per_thousand:9.2f}'
+                + ''.join(f'{t * per_thousand:15.2f}' for t in render_times)
+            )
+
+    def timed(self, func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter so nothing this process already imported hides the cost.
+SCRIPT = '''
+import importlib, sys
+importlib.import_module(sys.argv[1])
+if sys.argv[2] == '1':
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+'''
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from `python -X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(own), int(cumulative), depth))
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Report what a fresh worker imports and how long each module takes, using '
+        'python -X importtime on --module (todo.wsgi by default) in a new interpreter.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default='todo.wsgi')
+        parser.add_argument(
+            '--urls', action='store_true',
+            help='Also load the URLconf, as the first request does.',
+        )
+        parser.add_argument('--limit', type=int, default=25)
+        parser.add_argument('--sort', choices=('cumulative', 'self'), default='cumulative')
+        parser.add_argument(
+            '--prefix', action='append', default=[],
+            help='Only list modules starting with this (repeatable), e.g. --prefix tasks.',
+        )
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'todo.settings')}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', SCRIPT, options['module'], '1' if options['urls'] else '0'],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        rows = parse_importtime(result.stderr)
+        if result.returncode or not rows:
+            raise CommandError(f'Importing {options["module"]} failed:\n{result.stderr[-2000:]}')
+
+        modules = len(rows)
+        # Top-level imports' cumulative times add up to the whole import.
+        total = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+        if options['prefix']:
+            rows = [row for row in rows if row[0].startswith(tuple(options['prefix']))]
+        column = 2 if options['sort'] == 'cumulative' else 1
+        rows.sort(key=lambda row: row[column], reverse=True)
+
+        self.stdout.write(f'  {"module":<50}{"self ms":>10}{"cumul. ms":>12}')
+        for name, own, cumulative, _ in rows[:options['limit']]:
+            self.stdout.write(f'  {name:<50}{own / 1000:>10.1f}{cumulative / 1000:>12.1f}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {options["module"]}{" and the URLconf" if options["urls"] else ""} '
+            f'in {total / 1000:.0f} ms ({modules} modules).'
+        ))
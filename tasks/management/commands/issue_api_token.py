@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tasks.authentication import issue_token
+from tasks.models import ApiToken
+
+
+class Command(BaseCommand):
+    help = 'Issue an API token for a user. The token is printed once and only its hash is stored.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--name', default='', help='Label to recognise the token by.')
+        parser.add_argument(
+            '--scope', dest='scopes', action='append',
+            choices=[value for value, _ in ApiToken.SCOPE_CHOICES],
+            help='Repeat for several scopes (default: read and write).',
+        )
+        parser.add_argument('--days', type=int, default=90, help='Lifetime in days; 0 for no expiry.')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["username"]}" does not exist.')
+        expires_at = timezone.now() + timedelta(days=options['days']) if options['days'] > 0 else None
+        token, raw = issue_token(
+            user,
+            scopes=options['scopes'] or ('read', 'write'),
+            expires_at=expires_at,
+            name=options['name'],
+        )
+        self.stdout.write(raw)
+        self.stderr.write(
+            f'Issued token {token.prefix}… for {user.username} '
+            f'(scopes: {token.scopes}; expires: {token.expires_at or "never"}).'
+        )
@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tasks.models import Task, Notification, TaskComment, TaskAccess
+from tasks.notification_cache import bump_notification_versions
+
+
+class Command(BaseCommand):
+    help = (
+        'Permanently remove soft-deleted tasks. Comments, notifications and assignments '
+        'are deleted in small batches, each in its own short transaction, so the database '
+        'is never write-locked for long. Safe to interrupt and re-run: it picks up where it stopped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--pause', type=float, default=0.05,
+            help='Seconds to sleep between batches so other writers get the lock.',
+        )
+        parser.add_argument('--limit', type=int, help='Purge at most this many tasks in this run.')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        tasks = Task.all_objects.filter(deleted_at__isnull=False).order_by('deleted_at', 'pk')
+        task_ids = list(tasks.values_list('pk', flat=True)[:options['limit']])
+        if not task_ids:
+            self.stdout.write('No deleted tasks to purge.')
+            return
+
+        dependents = [
+            ('notifications', Notification),
+            ('comments', TaskComment),
+            ('assignments', Task.assigned_users.through),
+            ('access rows', TaskAccess),
+        ]
+        purged_rows = 0
+        for position, task_id in enumerate(task_ids, 1):
+            for label, model in dependents:
+                purged_rows += self.purge(model, task_id, label, options['batch_size'], options['pause'])
+            # Only the (now childless) task row is left, so this is a quick delete.
+            with transaction.atomic():
+                Task.all_objects.filter(pk=task_id).delete()
+            self.stdout.write(f'  [{position}/{len(task_ids)}] task {task_id} purged')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {len(task_ids)} task(s) and {purged_rows} dependent row(s).'
+        ))
+
+    def purge(self, model, task_id, label, batch_size, pause):
+        """Delete `model` rows pointing at `task_id`, batch_size primary keys at a time."""
+        total = 0
+        while True:
+            ids = list(model.objects.filter(task_id=task_id).order_by().values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return total
+            if model is Notification:
+                bump_notification_versions(
+                    Notification.objects.filter(pk__in=ids).order_by().values_list('user_id', flat=True).distinct()
+                )
+            model.objects.filter(pk__in=ids).delete()
+            total += len(ids)
+            if self.verbosity > 1:
+                self.stdout.write(f'    task {task_id}: {total} {label} deleted')
+            time.sleep(pause)
@@ -0,0 +1,91 @@
+from collections import Counter
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from tasks.models import Task, Notification, DailyRollup, journal_task_changes
+from tasks.notification_cache import bump_notification_versions
+
+
+class Command(BaseCommand):
+    help = (
+        'Flag tasks that are now due soon or overdue and notify their creator and '
+        'assignees once per transition. Run it on a schedule (e.g. hourly from cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--date', help='Treat this ISO date as "today" (for backfills and testing).')
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('--date must be an ISO date (YYYY-MM-DD).')
+        else:
+            today = timezone.localdate()
+        tomorrow = today + timedelta(days=1)
+        batch_size = options['batch_size']
+
+        overdue = Task.objects.filter(
+            due_state__in=['', 'due_soon'], due_date__lt=today,
+        ).exclude(status='completed')
+        self.today = today
+        flagged = self.sweep(overdue, 'overdue', batch_size, lambda title, due: Task.OVERDUE_MESSAGE.format(title=title))
+
+        due_soon = Task.objects.filter(
+            due_state='', due_date__gte=today, due_date__lte=tomorrow,
+        ).exclude(status='completed')
+        flagged_soon = self.sweep(
+            due_soon, 'due_soon', batch_size,
+            lambda title, due: f'Task "{title}" is due {"today" if due == today else "tomorrow"}.',
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Flagged {flagged} overdue and {flagged_soon} due-soon task(s).'
+        ))
+
+    def sweep(self, queryset, state, batch_size, message):
+        """
+        Walk the matching tasks in primary-key batches, flagging and
+        notifying each batch atomically. The rows are locked and the update
+        repeats the sweep's predicate, so a task completed or re-dated in
+        the meantime is left alone.
+        """
+        Assignment = Task.assigned_users.through
+        last_pk = 0
+        total = 0
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    queryset.filter(pk__gt=last_pk)
+                    .select_for_update()
+                    .order_by('pk')
+                    .values_list('pk', 'title', 'due_date', 'creator_id')[:batch_size]
+                )
+                if not rows:
+                    return total
+                last_pk = rows[-1][0]
+                ids = [row[0] for row in rows]
+                recipients = {pk: {creator_id} for pk, _, _, creator_id in rows}
+                for task_id, user_id in Assignment.objects.filter(task_id__in=ids).values_list('task_id', 'user_id'):
+                    recipients[task_id].add(user_id)
+                # update() skips Task.save, so bump the version and journal
+                # the change for sync clients here.
+                queryset.filter(pk__in=ids).update(due_state=state, version=F('version') + 1)
+                journal_task_changes(ids)
+                Notification.objects.bulk_create([
+                    Notification(user_id=user_id, task_id=pk, message=message(title, due_date))
+                    for pk, title, due_date, _ in rows
+                    for user_id in recipients[pk]
+                ])
+                bump_notification_versions(user_id for users in recipients.values() for user_id in users)
+                if state == 'overdue':
+                    # Nor does it count the transitions.
+                    per_user = Counter(user_id for users in recipients.values() for user_id in users)
+                    DailyRollup.bump(self.today, 'overdue', per_user)
+            total += len(rows)
+            self.stdout.write(f'  {state}: {total} task(s) processed')
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from tasks.backup import online_backup
+from tasks.routers import replica_alias
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the primary SQLite database onto the read replica file. '
+        'Useful for running the read/write router locally with two SQLite files.'
+    )
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError('No read replica is configured (set TODO_REPLICA_DB).')
+        primary = connections[DEFAULT_DB_ALIAS].settings_dict
+        replica = connections[alias].settings_dict
+        for db in (primary, replica):
+            if db['ENGINE'] != 'django.db.backends.sqlite3':
+                raise CommandError('sync_replica only supports SQLite databases.')
+        # Close Django's handle on the replica so the copy can replace its pages.
+        connections[alias].close()
+        stats = online_backup(primary['NAME'], replica['NAME'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Replica "{alias}" synced from primary ({stats.pages} pages, {stats.elapsed:.2f}s).'
+        ))
@@ -0,0 +1,43 @@
+from django.conf import settings
+
+from .routers import _use_replica, replica_alias, view_uses_replica
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Route reads of replica-safe views to the read alias.
+    After a client writes (any unsafe method), a short-lived cookie pins it
+    to the primary so it always reads its own writes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.cookie_name = getattr(settings, 'READ_REPLICA_PIN_COOKIE', 'db_pin')
+        self.pin_seconds = getattr(settings, 'READ_REPLICA_PIN_SECONDS', 10)
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            token = getattr(request, '_replica_token', None)
+            if token is not None:
+                _use_replica.reset(token)
+                request._replica_token = None
+        if request.method not in SAFE_METHODS and replica_alias():
+            response.set_cookie(
+                self.cookie_name, '1',
+                max_age=self.pin_seconds, httponly=True, samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.method in SAFE_METHODS
+            and self.cookie_name not in request.COOKIES
+            and view_uses_replica(view_func)
+            and replica_alias()
+        ):
+            request._replica_token = _use_replica.set(True)
+        return None
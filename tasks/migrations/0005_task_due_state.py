@@ -0,0 +1,31 @@
+# Stores overdue/due-soon state so overdue lookups are indexed.
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def mark_existing_overdue(apps, schema_editor):
+    # Tasks that are already overdue are flagged silently; only tasks that
+    # cross their due date from now on get a notification from the sweep.
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.filter(due_date__lt=timezone.localdate()).exclude(status='completed').update(due_state='overdue')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_slug'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='due_state',
+            field=models.CharField(blank=True, choices=[('', 'Not due'), ('due_soon', 'Due tomorrow'), ('overdue', 'Overdue')], default='', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['due_state', 'due_date'], name='task_due_state_idx'),
+        ),
+        migrations.RunPython(mark_existing_overdue, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Adds the append-only task activity log.
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_due_state'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('status', 'Status changed'), ('assigned', 'Users assigned'), ('unassigned', 'Users unassigned'), ('commented', 'Commented'), ('deleted', 'Deleted')], max_length=20)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='task_events', to=settings.AUTH_USER_MODEL)),
+                ('task', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='events', to='tasks.task')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['task', 'id'], name='taskevent_task_id_idx'), models.Index(fields=['actor', 'id'], name='taskevent_actor_id_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Replaces per-row read flags with a per-user read watermark.
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max, Min, Q
+
+
+def set_watermarks(apps, schema_editor):
+    # The watermark sits just below each user's oldest unread notification
+    # (or at their newest one if everything is read). Read rows above it keep
+    # is_read=True, so nothing changes state.
+    Notification = apps.get_model('tasks', 'Notification')
+    Profile = apps.get_model('tasks', 'Profile')
+    per_user = Notification.objects.values('user_id').annotate(
+        oldest_unread=Min('id', filter=Q(is_read=False)),
+        newest=Max('id'),
+    )
+    for row in per_user:
+        watermark = row['oldest_unread'] - 1 if row['oldest_unread'] else row['newest']
+        Profile.objects.update_or_create(
+            user_id=row['user_id'],
+            defaults={'last_read_notification_id': watermark},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_event'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='last_read_notification_id',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'id'], name='notification_user_id_idx'),
+        ),
+        migrations.RunPython(set_watermarks, migrations.RunPython.noop),
+    ]
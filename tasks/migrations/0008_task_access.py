@@ -0,0 +1,49 @@
+# Adds the materialized task visibility table and backfills it.
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_access(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskAccess = apps.get_model('tasks', 'TaskAccess')
+    Assignment = Task.assigned_users.through
+    created = dict(Task.objects.values_list('pk', 'created_at'))
+    rows = [
+        TaskAccess(user_id=creator_id, task_id=pk, role='owner', task_created_at=created[pk])
+        for pk, creator_id in Task.objects.values_list('pk', 'creator_id')
+    ]
+    owners = {(row.user_id, row.task_id) for row in rows}
+    rows += [
+        TaskAccess(user_id=user_id, task_id=task_id, role='collaborator', task_created_at=created[task_id])
+        for task_id, user_id in Assignment.objects.values_list('task_id', 'user_id')
+        if (user_id, task_id) not in owners
+    ]
+    TaskAccess.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_notification_read_watermark'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('owner', 'Owner'), ('collaborator', 'Collaborator')], max_length=12)),
+                ('task_created_at', models.DateTimeField()),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='access', to='tasks.task')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_access', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-task_created_at'], name='taskaccess_user_created_idx'), models.Index(fields=['user', 'role', '-task_created_at'], name='taskaccess_user_role_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'task'), name='unique_task_access')],
+            },
+        ),
+        migrations.RunPython(backfill_access, migrations.RunPython.noop),
+    ]
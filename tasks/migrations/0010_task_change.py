@@ -0,0 +1,43 @@
+# Adds the per-user sync journal used by the delta sync API.
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_changes(apps, schema_editor):
+    # One live entry per visible task so a first sync (cursor 0) returns everything.
+    TaskAccess = apps.get_model('tasks', 'TaskAccess')
+    TaskChange = apps.get_model('tasks', 'TaskChange')
+    TaskChange.objects.bulk_create(
+        [
+            TaskChange(user_id=user_id, task_id=task_id)
+            for user_id, task_id in TaskAccess.objects.order_by('task_created_at').values_list('user_id', 'task_id')
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_api_token'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('deleted', models.BooleanField(default=False)),
+                ('task', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tasks.task')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'id'], name='taskchange_user_id_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'task'), name='unique_task_change')],
+            },
+        ),
+        migrations.RunPython(backfill_changes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Addresses activity events to their recipients when they are recorded, and
+# backfills existing events from current access plus the task's creator.
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_recipients(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskAccess = apps.get_model('tasks', 'TaskAccess')
+    TaskEvent = apps.get_model('tasks', 'TaskEvent')
+    TaskEventRecipient = apps.get_model('tasks', 'TaskEventRecipient')
+    viewers = {}
+    for user_id, task_id in TaskAccess.objects.values_list('user_id', 'task_id'):
+        viewers.setdefault(task_id, set()).add(user_id)
+    for task_id, creator_id in Task._base_manager.values_list('pk', 'creator_id'):
+        viewers.setdefault(task_id, set()).add(creator_id)
+    rows = []
+    for event_id, task_id, kind, data in TaskEvent.objects.values_list('id', 'task_id', 'kind', 'data').iterator():
+        user_ids = set(viewers.get(task_id, ()))
+        if kind == 'unassigned':
+            user_ids.update((data or {}).get('users', ()))
+        rows.extend(TaskEventRecipient(event_id=event_id, user_id=user_id) for user_id in user_ids)
+        if len(rows) >= 1000:
+            TaskEventRecipient.objects.bulk_create(rows, ignore_conflicts=True)
+            rows = []
+    TaskEventRecipient.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0015_task_recurrence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskEventRecipient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipients', to='tasks.taskevent')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'event'), name='unique_task_event_recipient')],
+            },
+        ),
+        migrations.RunPython(backfill_recipients, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Lets notifications keep pointing at their task once it is archived.
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0016_task_event_recipient'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='archived_task',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notifications', to='tasks.archivedtask'),
+        ),
+    ]
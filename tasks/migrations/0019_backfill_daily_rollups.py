@@ -0,0 +1,33 @@
+# Fills DailyRollup from the task table (0012 created it empty), so the
+# dashboard and stats API are right straight after an upgrade. Same rebuild
+# as the backfill_rollups command; safe to re-run that afterwards.
+
+from django.db import migrations
+
+from tasks.management.commands.backfill_rollups import rollup_counts
+
+
+def backfill_rollups(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskAccess = apps.get_model('tasks', 'TaskAccess')
+    DailyRollup = apps.get_model('tasks', 'DailyRollup')
+    counts = rollup_counts(
+        Task.objects.filter(deleted_at__isnull=True).order_by(),
+        TaskAccess.objects.filter(task__deleted_at__isnull=True).order_by(),
+    )
+    DailyRollup.objects.all().delete()
+    DailyRollup.objects.bulk_create(
+        [DailyRollup(user_id=user_id, day=day, **values) for (user_id, day), values in counts.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0018_task_title_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,15 @@
-from django.db import models
+from contextlib import nullcontext
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Q
 from django.conf import settings
 from django.utils import timezone
 from django.utils.text import slugify
 
+from .notification_cache import bump_notification_versions
+from .recurrence import RECURRENCE_CHOICES, Rule
+
 
 def avatar_upload_path(instance, filename):
     return f'avatars/user_{instance.user_id}/{filename}'
@@ -15,11 +22,26 @@ class Profile(models.Model):
         related_name='profile'
     )
     avatar = models.FileField(upload_to=avatar_upload_path, blank=True, null=True)
+    # Every notification with an id up to this one counts as read; above it,
+    # only rows explicitly marked with is_read do. Makes "mark all read" a
+    # single-row write.
+    last_read_notification_id = models.BigIntegerField(default=0)
 
     def __str__(self):
         return f'{self.user.username} profile'
 
 
+class ConcurrentUpdate(Exception):
+    """The task was changed by someone else since it was loaded."""
+
+
+class TaskManager(models.Manager):
+    """Default manager: hides soft-deleted tasks (see Task.soft_delete)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Task(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -31,6 +53,12 @@ class Task(models.Model):
         ('medium', 'Medium'),
         ('high', 'High'),
     ]
+    DUE_STATE_CHOICES = [
+        ('', 'Not due'),
+        ('due_soon', 'Due tomorrow'),
+        ('overdue', 'Overdue'),
+    ]
+    OVERDUE_MESSAGE = 'Task "{title}" is overdue.'
 
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=250, unique=True, blank=True, null=True)
@@ -41,6 +69,25 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(null=True, blank=True)
+    # Maintained by Task.save and the sweep_due_dates command so overdue
+    # lists and counts are an indexed lookup instead of a date scan.
+    due_state = models.CharField(max_length=10, choices=DUE_STATE_CHOICES, default='', blank=True)
+    # Set by soft_delete(); the row and its dependents are removed later by
+    # the purge_deleted_tasks command.
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Bumped on every save; saves only apply if the row is still at the
+    # version that was loaded (see Task.save / expect_version).
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # Repeating tasks: only the current occurrence exists as a row and holds
+    # the rule; completing it creates the next one (see Task.save). Later
+    # occurrences are expanded on the fly by tasks.recurrence.
+    recurrence = models.CharField(max_length=10, choices=RECURRENCE_CHOICES, default='', blank=True)
+    recurrence_until = models.DateField(null=True, blank=True, help_text='Last date an occurrence may fall on.')
+    recurrence_count = models.PositiveIntegerField(
+        null=True, blank=True, help_text='Total number of occurrences, including the first.'
+    )
+    recurrence_start = models.DateField(null=True, blank=True, editable=False)
+    occurrence = models.PositiveIntegerField(default=1, editable=False)
 
     creator = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -53,24 +100,89 @@ class Task(models.Model):
         blank=True
     )
 
+    objects = TaskManager()
+    all_objects = models.Manager()
+
     class Meta:
         ordering = ['-created_at']
+        base_manager_name = 'all_objects'
+        indexes = [
+            models.Index(fields=['due_state', 'due_date'], name='task_due_state_idx'),
+            # Title prefix search in the admin (a case-sensitive range).
+            models.Index(fields=['title'], name='task_title_idx'),
+            models.Index(
+                fields=['deleted_at'],
+                name='task_deleted_at_idx',
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+            models.Index(
+                fields=['recurrence'],
+                name='task_recurrence_idx',
+                condition=~models.Q(recurrence=''),
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Snapshot of the loaded row, so save() can tell which transitions happened.
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        # **kwargs: from_queryset exists on Django 5.1+ only.
+        super().refresh_from_db(using, fields, **kwargs)
+        # Keep save()'s baseline in step with the reloaded values.
+        if hasattr(self, '_loaded_values'):
+            for field in self._meta.concrete_fields:
+                if field.attname in self.__dict__ and (fields is None or {field.name, field.attname} & set(fields)):
+                    self._loaded_values[field.attname] = getattr(self, field.attname)
+
+    def expect_version(self, version):
+        """Make the next save fail with ConcurrentUpdate unless the row is still at `version`."""
+        self._expected_version = version
+
     @property
     def is_overdue(self):
-        if self.due_date and self.status != 'completed':
-            return self.due_date < timezone.now().date()
-        return False
+        return self.due_state == 'overdue'
+
+    @property
+    def recurrence_rule(self):
+        return Rule.for_task(self)
+
+    def clean(self):
+        if self.recurrence and not self.due_date:
+            raise ValidationError({'due_date': 'A repeating task needs a due date to repeat from.'})
+        if self.recurrence_until and self.due_date and self.recurrence_until < self.due_date:
+            raise ValidationError({'recurrence_until': 'Must not be before the due date.'})
+
+    def refresh_due_state(self, today=None):
+        """
+        Bring due_state in line with status/due_date after an edit.
+        Crossing into due_soon/overdue over time is left to sweep_due_dates,
+        which also sends the notifications; an edit that moves the due date
+        into the past marks the task overdue straight away (and save()
+        notifies, see notify_overdue).
+        """
+        today = today or timezone.localdate()
+        if self.status == 'completed' or not self.due_date:
+            self.due_state = ''
+        elif self.due_date < today:
+            self.due_state = 'overdue'
+        elif self.due_date > today + timezone.timedelta(days=1) or self.due_state == 'overdue':
+            self.due_state = ''
 
     def save(self, *args, **kwargs):
         if not self.slug:
             base_slug = slugify(self.title)
             slug = base_slug
             counter = 1
-            while Task.objects.filter(slug=slug).exists():
+            # Soft-deleted tasks keep their slug until they are purged, and
+            # archived ones keep it for good (their URLs still resolve).
+            while Task.all_objects.filter(slug=slug).exists() or ArchivedTask.objects.filter(slug=slug).exists():
                 slug = f"{base_slug}-{counter}"
                 counter += 1
             self.slug = slug
@@ -78,7 +190,153 @@ class Task(models.Model):
             self.completed_at = timezone.now()
         elif self.status != 'completed':
             self.completed_at = None
-        super().save(*args, **kwargs)
+        self.refresh_due_state()
+        adding = self._state.adding
+        before = getattr(self, '_loaded_values', None)
+        # A hand-set due date re-anchors the schedule (occurrences created by
+        # spawn_next_occurrence() arrive with their anchor already set).
+        if self.recurrence and self.due_date and (
+            self.recurrence_start is None or (before is not None and before.get('due_date') != self.due_date)
+        ):
+            self.recurrence_start = self.due_date
+        # Completing the current occurrence hands the rule on to the next one.
+        rule = self.recurrence_rule if self.status == 'completed' else None
+        if rule is not None:
+            self.recurrence = ''
+        if not adding and before is not None:
+            kwargs['update_fields'] = self.changed_fields(before, kwargs.get('update_fields'))
+            self._checked_version = getattr(self, '_expected_version', None) or before.get('version')
+            if self._checked_version is not None:
+                self.version = self._checked_version + 1
+        try:
+            with transaction.atomic() if rule is not None else nullcontext():
+                super().save(*args, **kwargs)
+                if rule is not None:
+                    self.spawn_next_occurrence(rule)
+        except ConcurrentUpdate:
+            self.version = self._checked_version
+            if rule is not None:
+                self.recurrence = rule.kind
+            raise
+        finally:
+            self._checked_version = self._expected_version = None
+        self.update_rollups(adding, before)
+        self.notify_overdue(adding, before)
+        self._loaded_values = {field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields}
+
+    def changed_fields(self, before, update_fields=None):
+        """
+        Field names for a partial UPDATE: what differs from the loaded row
+        (or `update_fields`, plus the columns save() derives from them),
+        always with updated_at and version. A field that was deferred when
+        the row was loaded and has been assigned since counts as changed.
+        """
+        changed = {
+            field.name for field in self._meta.concrete_fields
+            if (field.attname in before and getattr(self, field.attname) != before[field.attname])
+            or (field.attname not in before and field.attname in self.__dict__)
+        }
+        if update_fields is not None:
+            changed = set(update_fields) | (changed & {'slug', 'completed_at', 'due_state', 'recurrence', 'recurrence_start'})
+        return sorted(changed | {'updated_at', 'version'})
+
+    def spawn_next_occurrence(self, rule):
+        """Create the occurrence after this one, carrying `rule` (None when the series is over)."""
+        following = rule.next_after(self.due_date, self.occurrence)
+        if following is None:
+            return None
+        occurrence, due_date = following
+        task = Task(
+            title=self.title,
+            # Dated, so the slug probe in save() doesn't walk -1, -2, ... for
+            # every occurrence of a long series.
+            slug=f'{slugify(self.title)}-{due_date:%Y-%m-%d}',
+            description=self.description,
+            priority=self.priority,
+            due_date=due_date,
+            creator_id=self.creator_id,
+            recurrence=rule.kind,
+            recurrence_until=rule.until,
+            recurrence_count=rule.count,
+            recurrence_start=rule.anchor,
+            occurrence=occurrence,
+        )
+        if Task.all_objects.filter(slug=task.slug).exists() or ArchivedTask.objects.filter(slug=task.slug).exists():
+            task.slug = None
+        task.save()
+        assignees = list(Task.assigned_users.through.objects.filter(task_id=self.pk).values_list('user_id', flat=True))
+        if assignees:
+            task.assigned_users.add(*assignees)
+        return task
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        # UPDATE ... WHERE id = %s AND version = %s: a stale copy updates nothing.
+        expected = getattr(self, '_checked_version', None)
+        if expected is None:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        updated = super()._do_update(base_qs.filter(version=expected), using, pk_val, values, update_fields, forced_update)
+        if not updated and base_qs.filter(pk=pk_val).exists():
+            raise ConcurrentUpdate(f'Task {pk_val} is no longer at version {expected}.')
+        return updated
+
+    def update_rollups(self, adding, before):
+        """
+        Count this save's transitions in DailyRollup: creation for the creator;
+        completion, reopening and going overdue for everyone who can see the
+        task. `before` is the row as loaded; without it nothing but creation
+        can be told apart.
+        """
+        if adding:
+            DailyRollup.bump(timezone.localdate(self.created_at), 'created', {self.creator_id: 1})
+            before = {}
+        elif before is None:
+            return
+        viewers = None
+
+        def everyone(delta):
+            nonlocal viewers
+            if viewers is None:
+                viewers = list(TaskAccess.objects.filter(task_id=self.pk).values_list('user_id', flat=True))
+            return dict.fromkeys(viewers, delta)
+
+        was_completed = before.get('status') == 'completed'
+        if self.status == 'completed' and not was_completed:
+            DailyRollup.bump(timezone.localdate(self.completed_at), 'completed', everyone(1))
+        elif was_completed and self.status != 'completed' and before.get('completed_at'):
+            DailyRollup.bump(timezone.localdate(before['completed_at']), 'completed', everyone(-1))
+        if self.due_state == 'overdue' and before.get('due_state') != 'overdue':
+            DailyRollup.bump(timezone.localdate(), 'overdue', everyone(1))
+
+    def notify_overdue(self, adding, before):
+        """
+        Tell the creator and assignees when this save made the task overdue.
+        The sweep only picks up tasks that aren't flagged yet, so each
+        transition is notified once, by whichever of the two made it.
+        """
+        if self.due_state != 'overdue' or (not adding and (before is None or before.get('due_state') == 'overdue')):
+            return
+        recipients = {self.creator_id}
+        recipients.update(Task.assigned_users.through.objects.filter(task_id=self.pk).values_list('user_id', flat=True))
+        message = self.OVERDUE_MESSAGE.format(title=self.title)
+        Notification.objects.bulk_create([Notification(user_id=user_id, task=self, message=message) for user_id in recipients])
+        bump_notification_versions(recipients)
+
+    def soft_delete(self, actor=None):
+        """
+        Hide the task straight away without touching its comments,
+        notifications or assignments, which can run to tens of thousands of
+        rows; purge_deleted_tasks removes those in small batches later.
+        Dropping the TaskAccess rows takes it out of every visibility query,
+        so the 'deleted' event is addressed to its viewers first.
+        """
+        self.deleted_at = timezone.now()
+        with transaction.atomic():
+            Task.all_objects.filter(pk=self.pk).update(deleted_at=self.deleted_at)
+            access = TaskAccess.objects.filter(task_id=self.pk)
+            viewers = list(access.values_list('user_id', 'task_id'))
+            TaskEvent.record(self.pk, 'deleted', actor, [user_id for user_id, _ in viewers], {'title': self.title})
+            journal_task_changes(removed=viewers)
+            access.delete()
 
 
 class Notification(models.Model):
@@ -97,13 +355,29 @@ class Notification(models.Model):
         null=True,
         blank=True
     )
+    # Set instead of `task` once archive_tasks moves the task to the archive.
+    archived_task = models.ForeignKey(
+        'ArchivedTask',
+        on_delete=models.SET_NULL,
+        related_name='notifications',
+        null=True,
+        blank=True
+    )
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'id'], name='notification_user_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username}: {self.message[:50]}"
 
+    @property
+    def linked_task_id(self):
+        """Id of the task this is about, live or archived (archiving keeps ids)."""
+        return self.task_id or self.archived_task_id
+
 
 class TaskComment(models.Model):
     """Comments on a task (for owner and collaborators)."""
@@ -127,11 +401,343 @@ class TaskComment(models.Model):
         return f"{self.user.username} on {self.task.title}: {self.text[:50]}"
 
 
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+class TaskAccess(models.Model):
+    """
+    Materialized visibility: one row per (user, task) the user can see, with
+    their role. Kept in sync by the handlers in tasks.signals so
+    visibility checks and per-user lists are plain index scans instead of
+    creator-OR-assignee joins with DISTINCT.
+    """
+    ROLE_CHOICES = [
+        ('owner', 'Owner'),
+        ('collaborator', 'Collaborator'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,  # covered by the indexes below
+        related_name='task_access'
+    )
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='access'
+    )
+    role = models.CharField(max_length=12, choices=ROLE_CHOICES)
+    # Copy of task.created_at so per-user listings are ordered from the index.
+    task_created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'task'], name='unique_task_access'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-task_created_at'], name='taskaccess_user_created_idx'),
+            models.Index(fields=['user', 'role', '-task_created_at'], name='taskaccess_user_role_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.role} of task {self.task_id}"
+
+
+class TaskChange(models.Model):
+    """
+    Sync journal: for each (user, task) pair, the latest change the user's
+    clients need to hear about. Rows are rewritten (delete + insert) on every
+    change, so their autoincrement id is a monotonic per-user cursor.
+    `deleted` rows are tombstones: the task was deleted or the user lost
+    access to it. The task link has no DB constraint so tombstones outlive it.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,  # covered by the indexes below
+        related_name='+'
+    )
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+'
+    )
+    deleted = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'task'], name='unique_task_change'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'id'], name='taskchange_user_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{'tombstone' if self.deleted else 'change'} #{self.pk}: task {self.task_id} for user {self.user_id}"
+
+
+class TaskEvent(models.Model):
+    """
+    Append-only activity log: one row per change to a task, whoever needs to
+    hear about it. The task link has no DB constraint so the history (including
+    the 'deleted' event) outlives the task itself. Who an event is for is
+    fixed when it is recorded (TaskEventRecipient), so losing access to a
+    task later doesn't hide its deletion or your own unassignment.
+    """
+    KIND_CHOICES = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('status', 'Status changed'),
+        ('assigned', 'Users assigned'),
+        ('unassigned', 'Users unassigned'),
+        ('commented', 'Commented'),
+        ('deleted', 'Deleted'),
+    ]
+
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,  # covered by the (task, id) index
+        related_name='events'
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name='task_events',
+        null=True,
+        blank=True
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['task', 'id'], name='taskevent_task_id_idx'),
+            models.Index(fields=['actor', 'id'], name='taskevent_actor_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} on task {self.task_id}"
+
+    @classmethod
+    def record(cls, task_id, kind, actor=None, recipients=(), data=None):
+        """Append one event for `task_id`, addressed to the user ids in `recipients`."""
+        with transaction.atomic():
+            event = cls.objects.create(task_id=task_id, actor=actor, kind=kind, data=data or {})
+            TaskEventRecipient.objects.bulk_create([
+                TaskEventRecipient(event=event, user_id=user_id) for user_id in set(recipients)
+            ])
+        return event
+
+
+class TaskEventRecipient(models.Model):
+    """One row per user a TaskEvent is for: the task's viewers when it was recorded."""
+    event = models.ForeignKey(
+        TaskEvent,
+        on_delete=models.CASCADE,
+        related_name='recipients'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,  # covered by the unique (user, event) constraint
+        related_name='+'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'event'], name='unique_task_event_recipient'),
+        ]
+
+    def __str__(self):
+        return f"event {self.event_id} for user {self.user_id}"
+
+
+class ArchivedTask(models.Model):
+    """
+    Cold storage for tasks completed long ago, moved here by the
+    archive_tasks command with their comments and assignments. Keeps the
+    original id and slug, so old links and event history still line up.
+    Read-only from the app's point of view.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    slug = models.SlugField(max_length=250, unique=True, null=True)
+    description = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    priority = models.CharField(max_length=20, choices=Task.PRIORITY_CHOICES)
+    due_date = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+    due_state = models.CharField(max_length=10, choices=Task.DUE_STATE_CHOICES, default='', blank=True)
+    version = models.PositiveIntegerField(default=1)
+    recurrence = models.CharField(max_length=10, choices=RECURRENCE_CHOICES, default='', blank=True)
+    recurrence_until = models.DateField(null=True, blank=True)
+    recurrence_count = models.PositiveIntegerField(null=True, blank=True)
+    recurrence_start = models.DateField(null=True, blank=True)
+    occurrence = models.PositiveIntegerField(default=1)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    creator = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_tasks'
+    )
+    assigned_users = models.ManyToManyField(
+        settings.AUTH_USER_MODEL,
+        through='ArchivedAssignment',
+        related_name='archived_assigned_tasks',
+        blank=True
+    )
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['title'], name='archivedtask_title_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    @property
+    def is_overdue(self):
+        return False  # only completed tasks are archived
+
+
+class ArchivedAssignment(models.Model):
+    """Through rows of ArchivedTask.assigned_users."""
+    task = models.ForeignKey(ArchivedTask, on_delete=models.CASCADE)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'user'], name='unique_archived_assignment'),
+        ]
+
+
+class ArchivedTaskComment(models.Model):
+    """TaskComment rows of archived tasks, with their original ids."""
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(ArchivedTask, on_delete=models.CASCADE, related_name='comments')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    text = models.TextField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"{self.user.username} on {self.task.title}: {self.text[:50]}"
+
+
+class DailyRollup(models.Model):
+    """
+    Per-user, per-day counters behind the dashboard and the stats API:
+    tasks created, completed (net of reopened ones) and gone overdue that
+    day. Updated incrementally by Task.save and sweep_due_dates; rebuilt
+    from the task table by backfill_rollups.
+    """
+    COUNTERS = ('created', 'completed', 'overdue')
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,  # covered by the unique (user, day) constraint
+        related_name='daily_rollups'
+    )
+    day = models.DateField()
+    created = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    overdue = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['day']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day'], name='unique_daily_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} on {self.day}: +{self.created} / {self.completed} done / {self.overdue} overdue"
+
+    @classmethod
+    def bump(cls, day, counter, deltas):
+        """Add deltas[user_id] to `counter` on each user's row for `day`, creating rows as needed."""
+        deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        cls.objects.bulk_create([cls(user_id=user_id, day=day) for user_id in deltas], ignore_conflicts=True)
+        by_delta = {}
+        for user_id, delta in deltas.items():
+            by_delta.setdefault(delta, []).append(user_id)
+        for delta, user_ids in by_delta.items():
+            cls.objects.filter(user_id__in=user_ids, day=day).update(**{counter: models.F(counter) + delta})
+
+
+class ApiToken(models.Model):
+    """
+    API token for scripts and integrations. Only a SHA-256 digest of the
+    token is stored; the raw value is shown once by issue_api_token.
+    """
+    SCOPE_CHOICES = [
+        ('read', 'Read'),
+        ('write', 'Write'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='api_tokens'
+    )
+    name = models.CharField(max_length=100, blank=True)
+    key_hash = models.CharField(max_length=64, unique=True)
+    prefix = models.CharField(max_length=12)
+    scopes = models.CharField(max_length=100, default='read write', help_text='Space-separated: read, write')
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    revoked_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.prefix}… ({self.user.username})"
+
+    @property
+    def scope_set(self):
+        return frozenset(self.scopes.split())
+
+    @property
+    def is_active(self):
+        if self.revoked_at:
+            return False
+        return self.expires_at is None or self.expires_at > timezone.now()
 
 
-@receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def create_profile_for_user(sender, instance, created, **kwargs):
-    if created:
-        Profile.objects.get_or_create(user=instance)
+def journal_task_changes(task_ids=(), removed=()):
+    """
+    Record a sync change on each of `task_ids` for everyone who can see it,
+    and a tombstone for each (user_id, task_id) pair in `removed`.
+    """
+    entries = {}
+    if task_ids:
+        for pair in TaskAccess.objects.filter(task_id__in=task_ids).values_list('user_id', 'task_id'):
+            entries[pair] = False
+    for pair in removed:
+        entries.setdefault(pair, True)
+    if not entries:
+        return
+    users_by_task = {}
+    for user_id, task_id in entries:
+        users_by_task.setdefault(task_id, []).append(user_id)
+    stale = Q()
+    for task_id, user_ids in users_by_task.items():
+        stale |= Q(task_id=task_id, user_id__in=user_ids)
+    # Delete + insert (rather than update) so every entry gets a new, higher id.
+    TaskChange.objects.filter(stale).delete()
+    TaskChange.objects.bulk_create([
+        TaskChange(user_id=user_id, task_id=task_id, deleted=deleted)
+        for (user_id, task_id), deleted in entries.items()
+    ])
@@ -0,0 +1,90 @@
+"""
+Micro-cache for the notification polling endpoints.
+Every user has a notification version in the shared cache, replaced (after
+commit) whenever their notifications or read watermark change. Poll
+responses are cached per process under (user, version, URL), so an idle
+tab costs a cache read instead of queries; the version doubles as the
+ETag, so a client that already has it gets an empty 304. Concurrent misses
+for the same key in one process share a single computation.
+Versions are random tokens written with a plain set rather than counters:
+the default 'shared' cache is file-based, where incr is a get + set and
+concurrent bumps could collapse or even move a version back to one that
+is still cached. A fresh token can never repeat, whichever write wins.
+The polled views read from the primary: data cached under a version has to
+include every write that version was bumped for, which a lagging replica
+can't promise.
+Writers that bypass Notification.save (bulk_create, update) must call
+bump_notification_versions() themselves.
+"""
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from .cache import NamespacedCache, SingleFlight
+
+versions = NamespacedCache('notification-version', alias='shared', timeout=None)
+responses = NamespacedCache('notification-poll', timeout=getattr(settings, 'NOTIFICATION_CACHE_SECONDS', 30))
+_flights = SingleFlight()
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def notification_version(user_id):
+    """The user's current notification version (started on first use)."""
+    version = versions.get(user_id)
+    if version is None:
+        versions.backend.add(versions.key(user_id), _new_version(), None)
+        version = versions.get(user_id)
+    return version
+
+
+def bump_notification_versions(user_ids):
+    """Invalidate the cached poll responses of `user_ids` once the current transaction commits."""
+    user_ids = set(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: _bump(user_ids))
+
+
+def _bump(user_ids):
+    versions.backend.set_many({versions.key(user_id): _new_version() for user_id in user_ids}, None)
+
+
+def cached_notification_poll(view):
+    """
+    For DRF function views (apply below @api_view): serve the view's data
+    from the micro-cache, or 304 if the client's If-None-Match is current.
+    """
+    # Imported here: tasks.signals loads this module at startup, and DRF is
+    # only needed once an API view is decorated.
+    from rest_framework.response import Response
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        user_id = request.user.pk
+        version = notification_version(user_id)
+        etag = f'W/"{version}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            key = (user_id, version, request.get_full_path())
+            data = responses.get(*key)
+            if data is not None:
+                response = Response(data)
+            else:
+                status_code, data = _flights.do(responses.key(*key), lambda: _compute(view, key, request, *args, **kwargs))
+                response = Response(data, status=status_code)
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    return wrapper
+
+
+def _compute(view, key, request, *args, **kwargs):
+    response = view(request, *args, **kwargs)
+    if response.status_code == 200:
+        responses.set(*key, value=response.data)
+    return response.status_code, response.data
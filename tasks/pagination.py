@@ -0,0 +1,73 @@
+"""
+Keyset pagination for the dashboard task lists.
+Pages are ordered newest first by (task_created_at, task id) straight from the
+TaskAccess indexes, so fetching page N costs the same as page 1. The cursor is
+a signed token carrying the list, the active filters and the last row seen;
+the fragment endpoint needs nothing else to render the next page.
+"""
+from django.core import signing
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .models import Task
+
+DASHBOARD_PAGE_SIZE = 20
+CURSOR_SALT = 'tasks.dashboard'
+FILTER_PARAMS = ('status', 'priority', 'q')
+# Dashboard list -> TaskAccess role
+DASHBOARD_LISTS = {
+    'created': 'owner',
+    'assigned': 'collaborator',
+}
+
+
+def dashboard_filters(params):
+    """status/priority/q from a QueryDict, empty ones dropped."""
+    filters = {name: params.get(name, '').strip() for name in FILTER_PARAMS}
+    return {name: value for name, value in filters.items() if value}
+
+
+def make_cursor(list_name, filters, task):
+    return signing.dumps(
+        {'list': list_name, 'filters': filters, 'after': [task.created_at.isoformat(), task.pk]},
+        salt=CURSOR_SALT,
+        compress=True,
+    )
+
+
+def read_cursor(cursor):
+    """(list_name, filters, after); raises signing.BadSignature on a bad or tampered cursor."""
+    data = signing.loads(cursor, salt=CURSOR_SALT)
+    try:
+        list_name, filters = data['list'], data['filters']
+        created_at, pk = data['after']
+        after = (parse_datetime(created_at), int(pk))
+    except (KeyError, TypeError, ValueError):
+        raise signing.BadSignature('Malformed cursor.')
+    if list_name not in DASHBOARD_LISTS or after[0] is None:
+        raise signing.BadSignature('Malformed cursor.')
+    return list_name, filters, after
+
+
+def dashboard_page(user, list_name, filters, after=None, size=DASHBOARD_PAGE_SIZE):
+    """One page of a dashboard list: (tasks, cursor for the next page or None)."""
+    # Every access__ condition goes in this single filter() so they share one join.
+    condition = Q(access__user=user, access__role=DASHBOARD_LISTS[list_name])
+    if after is not None:
+        created_at, pk = after
+        condition &= Q(access__task_created_at__lt=created_at) | Q(access__task_created_at=created_at, pk__lt=pk)
+    if filters.get('status'):
+        condition &= Q(status=filters['status'])
+    if filters.get('priority'):
+        condition &= Q(priority=filters['priority'])
+    if filters.get('q'):
+        condition &= Q(title__icontains=filters['q']) | Q(description__icontains=filters['q'])
+
+    queryset = Task.objects.filter(condition).order_by('-access__task_created_at', '-pk')
+    if list_name == 'assigned':
+        queryset = queryset.select_related('creator')
+    tasks = list(queryset[:size + 1])
+    if len(tasks) <= size:
+        return tasks, None
+    tasks = tasks[:size]
+    return tasks, make_cursor(list_name, filters, tasks[-1])
@@ -0,0 +1,202 @@
+"""
+On-demand request profiling for staff.
+A request is profiled only when it carries a valid signed token in the
+`_profile` query parameter or the `X-Profile` header and comes from a staff
+user, signed in or authenticated by the API's Authorization header (API
+token or Basic). Everything else goes straight through ProfilingMiddleware.
+Captured profiles (cProfile .prof, or speedscope JSON with pyinstrument) and
+the SQL they ran are written to PROFILING_DIR and listed at /admin/profiles/.
+"""
+import cProfile
+import json
+import re
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib import admin
+from django.core import signing
+from django.db import connections
+from django.http import FileResponse, Http404
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+
+from .cache import cache_stats
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:  # pyinstrument is optional; cProfile is always available
+    SamplingProfiler = None
+
+PROFILE_PARAM = '_profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+TOKEN_SALT = 'tasks.profiling'
+
+
+def profile_dir():
+    return Path(getattr(settings, 'PROFILING_DIR', settings.BASE_DIR / 'profiles'))
+
+
+def make_profile_token(user):
+    """Signed, time-limited token that lets `user` profile their own requests."""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(str(user.pk))
+
+
+def token_is_valid(token, user):
+    if not user.is_authenticated or not user.is_staff:
+        return False
+    max_age = getattr(settings, 'PROFILING_TOKEN_MAX_AGE', 3600)
+    try:
+        return signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=max_age) == str(user.pk)
+    except signing.BadSignature:
+        return False
+
+
+def requesting_user(request):
+    """
+    Who the request is from, for the token check. Middleware only sees
+    session logins; API clients authenticate inside DRF views, so their
+    Authorization header is checked here the same way.
+    """
+    if request.user.is_authenticated or 'HTTP_AUTHORIZATION' not in request.META:
+        return request.user
+    # Imported here: only requests that ask to be profiled get this far.
+    from rest_framework.authentication import BasicAuthentication
+    from rest_framework.exceptions import APIException
+    from .authentication import TokenAuthentication
+
+    for authenticator in (TokenAuthentication(), BasicAuthentication()):
+        try:
+            result = authenticator.authenticate(request)
+        except APIException:
+            break  # the view will reject the credentials itself
+        if result is not None:
+            return result[0]
+    return request.user
+
+
+class QueryRecorder:
+    """execute_wrapper that keeps every SQL statement with its duration."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': context['connection'].alias,
+                'sql': sql,
+                'params': repr(params),
+                'ms': round((time.perf_counter() - start) * 1000, 3),
+            })
+
+
+class ProfilingMiddleware:
+    """Profile the rest of the request when asked to by a staff user's signed token."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # Cheap string checks first so untriggered requests pay nothing.
+        if PROFILE_HEADER not in request.META and PROFILE_PARAM not in request.META.get('QUERY_STRING', ''):
+            return self.get_response(request)
+        token = request.META.get(PROFILE_HEADER) or request.GET.get(PROFILE_PARAM, '')
+        if not token_is_valid(token, requesting_user(request)):
+            return self.get_response(request)
+        return self.profile(request)
+
+    def profile(self, request):
+        recorder = QueryRecorder()
+        use_sampling = SamplingProfiler is not None and getattr(settings, 'PROFILING_ENGINE', '') == 'pyinstrument'
+        if use_sampling:
+            profiler = SamplingProfiler()
+            start, stop = profiler.start, profiler.stop
+        else:
+            profiler = cProfile.Profile()
+            start, stop = profiler.enable, profiler.disable
+        cache_before = cache_stats()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(recorder))
+            start()
+            try:
+                response = self.get_response(request)
+            finally:
+                stop()
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+        cache_delta = {
+            namespace: {
+                outcome: count - cache_before.get(namespace, {}).get(outcome, 0)
+                for outcome, count in counts.items()
+            }
+            for namespace, counts in cache_stats().items()
+        }
+
+        name = '{}-{}-{}'.format(
+            timezone.now().strftime('%Y%m%dT%H%M%S%f'),
+            request.method.lower(),
+            re.sub(r'[^A-Za-z0-9]+', '_', request.path).strip('_') or 'root',
+        )
+        directory = profile_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        if use_sampling:
+            (directory / f'{name}.speedscope.json').write_text(profiler.output(SpeedscopeRenderer()))
+        else:
+            profiler.dump_stats(directory / f'{name}.prof')
+        (directory / f'{name}.sql.json').write_text(json.dumps({
+            'path': request.get_full_path(),
+            'method': request.method,
+            'status': response.status_code,
+            'elapsed_ms': elapsed_ms,
+            'query_count': len(recorder.queries),
+            'queries': recorder.queries,
+            'cache': cache_delta,
+        }, indent=2))
+        response['X-Profile-Id'] = name
+        return response
+
+
+def profile_list(request):
+    """Admin page listing captured profiles, newest first."""
+    directory = profile_dir()
+    profiles = []
+    if directory.exists():
+        for sql_file in sorted(directory.glob('*.sql.json'), reverse=True):
+            name = sql_file.name[:-len('.sql.json')]
+            try:
+                summary = json.loads(sql_file.read_text())
+            except ValueError:
+                continue
+            files = sorted(p.name for p in directory.glob(f'{name}.*'))
+            profiles.append({'name': name, 'summary': summary, 'files': files})
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Request profiles',
+        'profiles': profiles,
+        'token': make_profile_token(request.user),
+        'param': PROFILE_PARAM,
+        'cache_stats': sorted(cache_stats().items()),
+    }
+    return TemplateResponse(request, 'admin/tasks/profiles.html', context)
+
+
+def profile_download(request, filename):
+    directory = profile_dir()
+    file_path = directory / filename
+    if file_path.parent != directory or not file_path.is_file():
+        raise Http404('Profile not found')
+    return FileResponse(file_path.open('rb'), as_attachment=True, filename=filename)
+
+
+urlpatterns = [
+    path('', admin.site.admin_view(profile_list), name='profile_list'),
+    path('<str:filename>', admin.site.admin_view(profile_download), name='profile_download'),
+]
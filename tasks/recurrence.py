@@ -0,0 +1,85 @@
+"""
+Recurrence rules for tasks.
+A recurring series keeps exactly one live row: the current occurrence,
+carrying the rule. Completing it creates the next one (Task.save), so the
+table grows with the number of active series, not with how far ahead anyone
+looks. Later occurrences are computed here on demand and never written.
+"""
+import calendar
+from dataclasses import dataclass
+from datetime import timedelta
+
+RECURRENCE_CHOICES = [
+    ('', 'Does not repeat'),
+    ('daily', 'Daily'),
+    ('weekly', 'Weekly'),
+    ('monthly', 'Monthly'),
+]
+
+
+def add_months(day, months, day_of_month):
+    """`day` moved `months` ahead, on `day_of_month` or the month's last day if shorter."""
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return day.replace(year=year, month=month, day=min(day_of_month, calendar.monthrange(year, month)[1]))
+
+
+@dataclass(frozen=True)
+class Rule:
+    kind: str
+    # The date the schedule is counted from; monthly series keep its day of
+    # the month, so Jan 31 is followed by Feb 28 and then Mar 31.
+    anchor: object
+    until: object = None
+    # Total occurrences in the series, None for no limit.
+    count: int = None
+
+    @classmethod
+    def for_task(cls, task):
+        """The task's rule, or None if it doesn't repeat (or has no due date to repeat from)."""
+        if not task.recurrence or not task.due_date:
+            return None
+        return cls(task.recurrence, task.recurrence_start or task.due_date, task.recurrence_until, task.recurrence_count)
+
+    def advance(self, day, steps):
+        if self.kind == 'daily':
+            return day + timedelta(days=steps)
+        if self.kind == 'weekly':
+            return day + timedelta(days=7 * steps)
+        return add_months(day, steps, self.anchor.day)
+
+    def steps_before(self, day, start):
+        """How many whole steps from `day` stay short of `start` (a lower bound is fine)."""
+        if self.kind == 'daily':
+            return (start - day).days - 1
+        if self.kind == 'weekly':
+            return (start - day).days // 7 - 1
+        return (start.year - day.year) * 12 + start.month - day.month - 1
+
+    def following(self, day, occurrence):
+        """Yield (occurrence number, due date) for the occurrences after `day`, in order."""
+        while self.count is None or occurrence < self.count:
+            day = self.advance(day, 1)
+            occurrence += 1
+            if self.until is not None and day > self.until:
+                return
+            yield occurrence, day
+
+    def next_after(self, day, occurrence):
+        """(occurrence number, due date) of the next occurrence, or None if the series is over."""
+        return next(self.following(day, occurrence), None)
+
+    def between(self, day, occurrence, start, end):
+        """The occurrences after `day` that fall in start..end (inclusive)."""
+        # Jump straight to just before the range instead of stepping through
+        # every occurrence in between.
+        skip = self.steps_before(day, start)
+        if self.count is not None:
+            skip = min(skip, self.count - occurrence)
+        if skip > 0:
+            day, occurrence = self.advance(day, skip), occurrence + skip
+        for number, due in self.following(day, occurrence):
+            if due > end:
+                return
+            if due >= start:
+                yield number, due
@@ -0,0 +1,35 @@
+"""
+JSON renderer backed by orjson when it is installed.
+Dates and other non-native values are still formatted by DRF's encoder and
+U+2028/U+2029 are escaped like JSONRenderer does, so for the data these
+APIs return the output matches DRF's. Known differences on the orjson
+path: NaN and infinities render as null (JSONRenderer refuses them under
+STRICT_JSON), and floats come from orjson's formatter, which can spell
+exponents differently (1e16 rather than 1e+16). Pretty-printed, ASCII-only
+(UNICODE_JSON = False) and non-compact output stay on the stdlib path.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; falls back to the stdlib encoder
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Pretty-printing (?indent / Accept: ...; indent=N) stays on the stdlib path.
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Valid JSON but not valid JavaScript; JSONRenderer escapes them too.
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -0,0 +1,59 @@
+"""
+Read/write database routing.
+Writes always go to the primary ('default'). Reads made while a view marked
+with @replica_reads is running go to the read alias (READ_REPLICA_ALIAS),
+unless the replica isn't configured or the client recently wrote something
+(read-your-writes stickiness, see ReplicaRoutingMiddleware).
+"""
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Set by ReplicaRoutingMiddleware for the duration of a replica-safe view.
+_use_replica = ContextVar('tasks_use_replica', default=False)
+
+# Apps whose reads must always see the primary (e.g. a session that was
+# just created on login must not be looked up on a lagging replica).
+PRIMARY_ONLY_APPS = {'sessions'}
+
+
+def replica_alias():
+    """The configured read alias, or None when no replica is set up."""
+    alias = getattr(settings, 'READ_REPLICA_ALIAS', None)
+    if alias and alias in connections.databases:
+        return alias
+    return None
+
+
+def replica_reads(view):
+    """Mark a view (function or class) as safe to serve reads from the replica."""
+    view.replica_reads = True
+    return view
+
+
+def view_uses_replica(view_func):
+    if getattr(view_func, 'replica_reads', False):
+        return True
+    view_class = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+    return getattr(view_class, 'replica_reads', False)
+
+
+class ReadReplicaRouter:
+    """Send reads to the replica inside replica-safe views, everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        if not _use_replica.get() or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        return replica_alias() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data, so relations across them are fine.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica needs the same schema so it can be synced from the primary.
+        return True
@@ -1,9 +1,31 @@
 from rest_framework import serializers
-from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
 from .models import Task
+from .assignment import AssignmentDiff, assign_users, validate_user_ids
 
 
-class TaskListSerializer(serializers.ModelSerializer):
+def requested_fields(request, available):
+    """Fields asked for with ?fields=a,b (unknown names ignored), or None for all."""
+    raw = request.query_params.get('fields') if hasattr(request, 'query_params') else request.GET.get('fields')
+    if not raw:
+        return None
+    wanted = {name.strip() for name in raw.split(',')}
+    return [name for name in available if name in wanted] or None
+
+
+class SparseFieldsetMixin:
+    """Serializer that drops every field not listed in the `fields` kwarg."""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class TaskListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """List tasks: owner or collaborator only."""
     creator_username = serializers.CharField(source='creator.username', read_only=True)
     assigned_usernames = serializers.SerializerMethodField()
@@ -13,26 +35,134 @@ class TaskListSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'description', 'status', 'priority',
             'due_date', 'created_at', 'updated_at', 'completed_at',
-            'creator_username', 'assigned_usernames',
+            'creator_username', 'assigned_usernames', 'version',
+            'recurrence', 'recurrence_until', 'recurrence_count', 'occurrence',
         ]
 
     def get_assigned_usernames(self, obj):
         return list(obj.assigned_users.values_list('username', flat=True))
 
 
-class TaskCreateSerializer(serializers.ModelSerializer):
+TASK_LIST_FIELDS = TaskListSerializer.Meta.fields
+# Serializer field -> model columns it reads, for narrowing queries with only().
+TASK_FIELD_COLUMNS = {
+    'creator_username': ['creator__username'],
+    'assigned_usernames': [],
+}
+
+
+def narrow_task_queryset(queryset, fields):
+    """Select only the columns `fields` need (all of TaskListSerializer's when None)."""
+    fields = fields or TASK_LIST_FIELDS
+    columns = {'id'}
+    for name in fields:
+        columns.update(TASK_FIELD_COLUMNS.get(name, [name]))
+    if 'creator_username' in fields:
+        queryset = queryset.select_related('creator')
+    return queryset.only(*columns)
+
+
+def _datetime(value):
+    # Same output as DRF's DateTimeField.
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+def _date(value):
+    return value.isoformat() if value is not None else None
+
+
+def serialize_task_rows(queryset, fields=None):
+    """
+    Read-only fast path for task lists: same output as
+    TaskListSerializer(many=True), built from values() rows instead of model
+    instances and serializer fields, with assignees fetched in one query.
+    Also accepts ArchivedTask querysets.
+    """
+    fields = fields or TASK_LIST_FIELDS
+    columns = ['id']
+    for name in fields:
+        for column in TASK_FIELD_COLUMNS.get(name, [name]):
+            if column not in columns:
+                columns.append(column)
+    rows = list(queryset.values(*columns))
+
+    assignees = {}
+    if 'assigned_usernames' in fields and rows:
+        # Task or ArchivedTask: both through tables have task_id/user columns.
+        through = queryset.model.assigned_users.through.objects.filter(task_id__in=[row['id'] for row in rows])
+        for task_id, username in through.order_by('pk').values_list('task_id', 'user__username'):
+            assignees.setdefault(task_id, []).append(username)
+
+    formatters = {
+        'due_date': _date,
+        'recurrence_until': _date,
+        'created_at': _datetime,
+        'updated_at': _datetime,
+        'completed_at': _datetime,
+    }
+    result = []
+    for row in rows:
+        item = {}
+        for name in fields:
+            if name == 'creator_username':
+                item[name] = row['creator__username']
+            elif name == 'assigned_usernames':
+                item[name] = assignees.get(row['id'], [])
+            elif name in formatters:
+                item[name] = formatters[name](row[name])
+            else:
+                item[name] = row[name]
+        result.append(item)
+    return result
+
+
+class AssigneeIdsField(serializers.ListField):
+    """Assignee user ids, checked with one query for the whole list."""
+    child = serializers.IntegerField(min_value=1)
+
+    def to_internal_value(self, data):
+        user_ids, missing = validate_user_ids(super().to_internal_value(data))
+        if missing:
+            raise serializers.ValidationError(
+                [f'Invalid pk "{user_id}" - object does not exist.' for user_id in missing]
+            )
+        return user_ids
+
+    def to_representation(self, value):
+        if hasattr(value, 'values_list'):
+            value = value.values_list('pk', flat=True)
+        return sorted(value)
+
+
+class RecurrenceValidationMixin:
+    """Task.clean()'s recurrence checks, against the instance's values for fields not sent."""
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        current = self.instance or Task()
+        task = Task(**{
+            name: attrs.get(name, getattr(current, name))
+            for name in ('recurrence', 'due_date', 'recurrence_until')
+        })
+        try:
+            task.clean()
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.message_dict)
+        return attrs
+
+
+class TaskCreateSerializer(RecurrenceValidationMixin, serializers.ModelSerializer):
     """Create task: sets creator to request.user."""
-    assigned_users = serializers.PrimaryKeyRelatedField(
-        many=True,
-        queryset=User.objects.all(),
-        required=False
-    )
+    assigned_users = AssigneeIdsField(required=False)
 
     class Meta:
         model = Task
         fields = [
             'title', 'description', 'status', 'priority', 'due_date',
-            'assigned_users',
+            'assigned_users', 'recurrence', 'recurrence_until', 'recurrence_count',
         ]
         extra_kwargs = {
             'status': {'default': 'pending'},
@@ -43,22 +173,22 @@ class TaskCreateSerializer(serializers.ModelSerializer):
         validated_data['creator'] = self.context['request'].user
         assigned = validated_data.pop('assigned_users', [])
         task = Task.objects.create(**validated_data)
-        if assigned:
-            task.assigned_users.set(assigned)
+        self.assignment = assign_users(task, assigned, current=())
         return task
 
 
-class TaskUpdateSerializer(serializers.ModelSerializer):
+class TaskUpdateSerializer(RecurrenceValidationMixin, serializers.ModelSerializer):
     """Owner: full update. Collaborator: status only (enforced in api_views)."""
-    assigned_users = serializers.PrimaryKeyRelatedField(
-        many=True,
-        queryset=User.objects.all(),
-        required=False
-    )
+    assigned_users = AssigneeIdsField(required=False)
+    # The version the client last saw; the update is refused (409) if the task moved on.
+    version = serializers.IntegerField(required=False, write_only=True, min_value=1)
 
     class Meta:
         model = Task
-        fields = ['title', 'description', 'status', 'priority', 'due_date', 'assigned_users']
+        fields = [
+            'title', 'description', 'status', 'priority', 'due_date', 'assigned_users', 'version',
+            'recurrence', 'recurrence_until', 'recurrence_count',
+        ]
         extra_kwargs = {
             'title': {'required': False},
             'description': {'required': False},
@@ -69,9 +199,10 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         assigned = validated_data.pop('assigned_users', None)
+        if 'version' in validated_data:
+            instance.expect_version(validated_data.pop('version'))
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
-        if assigned is not None:
-            instance.assigned_users.set(assigned)
+        self.assignment = assign_users(instance, assigned) if assigned is not None else AssignmentDiff()
         return instance
@@ -0,0 +1,110 @@
+"""
+Signal handlers for the tasks app, connected in TasksConfig.ready().
+They keep the derived tables (profiles, TaskAccess, the sync journal) and
+the notification poll versions in step with writes made through the ORM.
+"""
+from django.conf import settings
+from django.db.models.signals import post_save, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from .models import Profile, Task, Notification, TaskAccess, journal_task_changes
+from .notification_cache import bump_notification_versions
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_profile_for_user(sender, instance, created, **kwargs):
+    if created:
+        Profile.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, **kwargs):
+    bump_notification_versions([instance.user_id])
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, **kwargs):
+    removed = []
+    if created:
+        TaskAccess.objects.get_or_create(
+            user_id=instance.creator_id,
+            task=instance,
+            defaults={'role': 'owner', 'task_created_at': instance.created_at},
+        )
+    else:
+        # Task.save hasn't replaced its snapshot yet, so this is the old creator.
+        previous = (getattr(instance, '_loaded_values', None) or {}).get('creator_id')
+        if previous is not None and previous != instance.creator_id:
+            removed = transfer_ownership(instance, previous)
+    journal_task_changes([instance.pk], removed)
+
+
+def transfer_ownership(task, previous_creator_id):
+    """
+    Move the 'owner' TaskAccess row to task.creator. The old creator keeps
+    a 'collaborator' row if they are assigned; returns the (user_id, task_id)
+    pairs that lost access, for the sync journal.
+    """
+    TaskAccess.objects.update_or_create(
+        user_id=task.creator_id,
+        task=task,
+        defaults={'role': 'owner', 'task_created_at': task.created_at},
+    )
+    old = TaskAccess.objects.filter(user_id=previous_creator_id, task=task, role='owner')
+    if Task.assigned_users.through.objects.filter(task=task, user_id=previous_creator_id).exists():
+        old.update(role='collaborator')
+        return []
+    old.delete()
+    return [(previous_creator_id, task.pk)]
+
+
+@receiver(pre_delete, sender=Task)
+def task_deleting(sender, instance, **kwargs):
+    # TaskAccess rows cascade away with the task, so tombstone its viewers first.
+    viewers = TaskAccess.objects.filter(task=instance).values_list('user_id', 'task_id')
+    journal_task_changes(removed=list(viewers))
+
+
+@receiver(m2m_changed, sender=Task.assigned_users.through)
+def sync_collaborator_access(sender, instance, action, reverse, pk_set, **kwargs):
+    """Mirror assigned_users changes (from either side of the relation) into TaskAccess and the sync journal."""
+    if action in ('pre_clear', 'post_clear'):
+        lookup = {'user': instance} if reverse else {'task': instance}
+        if action == 'pre_clear':
+            # The relation is emptied in between; note which tasks were affected.
+            instance._cleared_task_ids = list(
+                Task.assigned_users.through.objects.filter(**lookup).values_list('task_id', flat=True)
+            )
+            return
+        revoked = TaskAccess.objects.filter(role='collaborator', **lookup)
+        removed = list(revoked.values_list('user_id', 'task_id'))
+        revoked.delete()
+        journal_task_changes(getattr(instance, '_cleared_task_ids', []), removed)
+        return
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+    task_ids = list(pk_set) if reverse else [instance.pk]
+    if action == 'post_remove':
+        if reverse:
+            revoked = TaskAccess.objects.filter(user=instance, task_id__in=pk_set, role='collaborator')
+        else:
+            revoked = TaskAccess.objects.filter(task=instance, user_id__in=pk_set, role='collaborator')
+        removed = list(revoked.values_list('user_id', 'task_id'))
+        revoked.delete()
+        journal_task_changes(task_ids, removed)
+        return
+    if reverse:
+        rows = [
+            TaskAccess(user_id=instance.pk, task_id=pk, role='collaborator', task_created_at=created_at)
+            for pk, creator_id, created_at in Task.objects.filter(pk__in=pk_set).values_list('pk', 'creator_id', 'created_at')
+            if creator_id != instance.pk
+        ]
+    else:
+        rows = [
+            TaskAccess(user_id=user_id, task_id=instance.pk, role='collaborator', task_created_at=instance.created_at)
+            for user_id in pk_set
+            if user_id != instance.creator_id
+        ]
+    # The owner keeps their 'owner' row if they also appear as an assignee.
+    TaskAccess.objects.bulk_create(rows, ignore_conflicts=True)
+    journal_task_changes(task_ids)
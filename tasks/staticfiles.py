@@ -0,0 +1,157 @@
+"""
+Static asset pipeline.
+collectstatic minifies the collected CSS/JS, fingerprints every file
+(ManifestStaticFilesStorage) from that minified content, then writes .gz
+(and .br when brotli is installed) siblings.
+serve_static hands out the pre-compressed variant the client accepts and
+marks fingerprinted files as immutable, so repeat page loads only fetch HTML.
+"""
+import gzip
+import mimetypes
+import posixpath
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404
+from django.utils._os import safe_join
+from django.views.decorators.http import require_safe
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always produced
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.json', '.svg', '.txt', '.html', '.map', '.xml'}
+MIN_COMPRESS_SIZE = 256
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'public, max-age=0, must-revalidate'
+
+
+CSS_STRING_OR_COMMENT = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/', re.S)
+# "prop: value" inside a declaration block: after { or ;, with no { before
+# the closing ; or } (so selectors such as a:hover are left alone).
+CSS_DECLARATION_COLON = re.compile(r'(?<=[{;])([^{};:]*?)\s*:\s*(?=[^{};]*[;}])')
+
+
+def minify_css(text):
+    """Drop comments and collapse whitespace, leaving strings untouched."""
+    strings = []
+
+    def protect(match):
+        if match.group().startswith('/*'):
+            return ' '
+        strings.append(match.group())
+        return f'\x00{len(strings) - 1}\x00'
+
+    text = CSS_STRING_OR_COMMENT.sub(protect, text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,])\s*', r'\1', text)
+    text = CSS_DECLARATION_COLON.sub(r'\1:', text)
+    text = text.replace(';}', '}').strip()
+    return re.sub(r'\x00(\d+)\x00', lambda match: strings[int(match.group(1))], text)
+
+
+def minify_js(text):
+    """Conservative: drop indentation, blank lines and whole-line // comments."""
+    lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line and not line.startswith('//'):
+            lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Fingerprinted storage that also minifies and pre-compresses text assets."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            # Minify the collected copies and hash those (instead of the
+            # source files), so each fingerprint matches what is served.
+            for name in paths:
+                minify = MINIFIERS.get(posixpath.splitext(name)[1])
+                if minify and '.min.' not in posixpath.basename(name):
+                    path = Path(self.path(name))
+                    path.write_text(minify(path.read_text(encoding='utf-8')), encoding='utf-8')
+            paths = {name: (self, name) for name in paths}
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in list(self.hashed_files) + list(self.hashed_files.values()):
+            self.compress(Path(self.path(name)))
+
+    def compress(self, path):
+        if path.suffix not in COMPRESSIBLE_EXTENSIONS or not path.exists():
+            return
+        data = path.read_bytes()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        Path(f'{path}.gz').write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            Path(f'{path}.br').write_bytes(brotli.compress(data))
+
+
+def accepted_encodings(header):
+    """Content codings an Accept-Encoding header allows, mapped to their q-values."""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def accepts_encoding(accepted, coding):
+    """Whether `coding` is acceptable: listed (or covered by *) with q > 0."""
+    return accepted.get(coding, accepted.get('*', 0.0)) > 0
+
+
+@lru_cache(maxsize=1)
+def fingerprinted_names():
+    """Hashed names from the collectstatic manifest (read once per process)."""
+    return frozenset(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+
+@require_safe
+def serve_static(request, path):
+    """Serve a collected static file, preferring a pre-compressed variant."""
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = Path(safe_join(settings.STATIC_ROOT, path))
+    except SuspiciousFileOperation:
+        raise Http404('Invalid static path')
+    if not fullpath.is_file():
+        raise Http404('Static file not found')
+
+    accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    encoding = None
+    for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+        variant = Path(f'{fullpath}{suffix}')
+        if accepts_encoding(accepted, candidate) and variant.is_file():
+            fullpath, encoding = variant, candidate
+            break
+
+    content_type, _ = mimetypes.guess_type(path)
+    response = FileResponse(fullpath.open('rb'), content_type=content_type or 'application/octet-stream')
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Vary'] = 'Accept-Encoding'
+    response['Cache-Control'] = IMMUTABLE_CACHE if path in fingerprinted_names() else REVALIDATE_CACHE
+    return response
@@ -0,0 +1,90 @@
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .models import Task, TaskAccess
+from .utils import visible_tasks
+
+
+class PartialSaveTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user('alice', password='pw')
+
+    def test_assigned_deferred_field_is_saved(self):
+        task = Task.objects.create(title='Write report', description='old', creator=self.alice)
+        loaded = Task.objects.only('id', 'title').get(pk=task.pk)
+        loaded.description = 'new'
+        loaded.save()
+        self.assertEqual(Task.objects.get(pk=task.pk).description, 'new')
+
+    def test_untouched_deferred_field_is_left_alone(self):
+        task = Task.objects.create(title='Write report', description='old', creator=self.alice)
+        loaded = Task.objects.only('id', 'title').get(pk=task.pk)
+        Task.objects.filter(pk=task.pk).update(description='changed elsewhere')
+        loaded.title = 'Write the report'
+        loaded.save()
+        row = Task.objects.get(pk=task.pk)
+        self.assertEqual((row.title, row.description), ('Write the report', 'changed elsewhere'))
+
+
+class AdminChangelistQueryTests(TestCase):
+    """The Task changelist runs the same queries whatever the table size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        cls.users = [User.objects.create_user(f'user-{i}') for i in range(5)]
+
+    def seed(self, start, stop):
+        tasks = Task.objects.bulk_create([
+            Task(title=f'Task {i}', slug=f'task-{i}', creator=self.users[i % len(self.users)])
+            for i in range(start, stop)
+        ])
+        Task.assigned_users.through.objects.bulk_create([
+            Task.assigned_users.through(task_id=task.pk, user_id=self.users[(task.pk + 1) % len(self.users)].pk)
+            for task in tasks
+        ])
+
+    def load_changelist(self):
+        request = RequestFactory().get('/admin/tasks/task/')
+        request.user = self.superuser
+        admin.site._registry[Task].changelist_view(request).render()
+
+    def test_query_count_is_constant(self):
+        self.seed(0, 5)
+        with CaptureQueriesContext(connection) as small:
+            self.load_changelist()
+        self.seed(5, 300)
+        with self.assertNumQueries(len(small)):
+            self.load_changelist()
+
+
+class OwnershipTransferTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user('alice', password='pw')
+        cls.bob = User.objects.create_user('bob', password='pw')
+
+    def access(self, task):
+        return set(TaskAccess.objects.filter(task=task).values_list('user__username', 'role'))
+
+    def test_creator_change_moves_owner_row(self):
+        task = Task.objects.create(title='Plan', creator=self.alice)
+        task = Task.objects.get(pk=task.pk)
+        task.creator = self.bob
+        task.save()
+        self.assertEqual(self.access(task), {('bob', 'owner')})
+        self.assertEqual(list(visible_tasks(self.bob)), [task])
+
+    def test_assigned_previous_creator_stays_collaborator(self):
+        task = Task.objects.create(title='Plan', creator=self.alice)
+        task.assigned_users.add(self.alice)
+        task = Task.objects.get(pk=task.pk)
+        task.creator = self.bob
+        task.save()
+        self.assertEqual(self.access(task), {('alice', 'collaborator'), ('bob', 'owner')})
@@ -1,7 +1,7 @@
 from django.urls import path
 from django.shortcuts import redirect
 from . import views
-from .api_views import TaskListCreateAPI, TaskDetailAPI, notification_unread_count, notification_latest
+from .lazyurls import lazy_path
 
 app_name = 'tasks'
 
@@ -11,6 +11,7 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/tasks/', views.dashboard_tasks, name='dashboard_tasks'),
     path('task/', lambda r: redirect('tasks:dashboard')),
     path('task/create/', views.task_create, name='task_create'),
     path('task/<slug:slug>/', views.task_detail, name='task_detail'),
@@ -22,8 +23,16 @@ urlpatterns = [
     path('notifications/<int:pk>/read/', views.notification_mark_read, name='notification_mark_read'),
     path('profile/', views.profile_view, name='profile'),
     path('api/users/search/', views.user_search_api, name='user_search_api'),
-    path('api/tasks/', TaskListCreateAPI.as_view(), name='api_task_list_create'),
-    path('api/tasks/<int:pk>/', TaskDetailAPI.as_view(), name='api_task_detail'),
-    path('api/notifications/unread-count/', notification_unread_count, name='api_notification_unread_count'),
-    path('api/notifications/latest/', notification_latest, name='api_notification_latest'),
+    # DRF views: imported on first request (or by tasks.warmup), not at startup.
+    lazy_path('api/tasks/', 'tasks.api_views.TaskListCreateAPI', name='api_task_list_create'),
+    lazy_path('api/tasks/<int:pk>/', 'tasks.api_views.TaskDetailAPI', name='api_task_detail'),
+    lazy_path('api/tasks/sync/', 'tasks.api_views.task_sync', name='api_task_sync'),
+    lazy_path('api/tasks/calendar/', 'tasks.api_views.task_calendar', name='api_task_calendar'),
+    lazy_path(
+        'api/notifications/unread-count/', 'tasks.api_views.notification_unread_count',
+        name='api_notification_unread_count',
+    ),
+    lazy_path('api/notifications/latest/', 'tasks.api_views.notification_latest', name='api_notification_latest'),
+    lazy_path('api/activity/', 'tasks.api_views.activity_feed', name='api_activity_feed'),
+    lazy_path('api/stats/timeseries/', 'tasks.api_views.stats_timeseries', name='api_stats_timeseries'),
 ]
@@ -4,7 +4,11 @@ Role-based access for shared tasks:
   Owner (creator) → full access: edit, delete, assign.
   Collaborator (assigned user) → update only: view, update status, add comments.
 """
-from .models import Task, Notification
+from django.db.models import Q
+
+from .models import Task, Notification, Profile, TaskAccess, TaskEvent, ArchivedTask, ArchivedAssignment
+from .notification_cache import bump_notification_versions
+from .recurrence import Rule
 
 
 def user_can_edit_task(user, task):
@@ -14,29 +18,152 @@ def user_can_edit_task(user, task):
 
 def user_can_update_status(user, task):
     """Owner or collaborator: update status."""
-    if task.creator_id == user.id:
-        return True
-    return task.assigned_users.filter(pk=user.pk).exists()
+    return user_task_role(user, task) is not None
 
 
 def user_can_view_task(user, task):
     """Creator or assigned user can view."""
+    return user_task_role(user, task) is not None
+
+
+def user_task_role(user, task):
+    """'owner', 'collaborator' or None, from the TaskAccess table."""
     if task.creator_id == user.id:
-        return True
-    return task.assigned_users.filter(pk=user.pk).exists()
+        return 'owner'
+    return TaskAccess.objects.filter(user_id=user.id, task_id=task.pk).values_list('role', flat=True).first()
+
+
+def visible_tasks(user, role=None):
+    """Tasks `user` can see (optionally only as `role`), newest first, without DISTINCT."""
+    access = {'access__user': user}
+    if role:
+        access['access__role'] = role
+    return Task.objects.filter(**access).order_by('-access__task_created_at')
+
+
+def visible_archived_tasks(user):
+    """Archived tasks `user` created or was assigned to (history and export only)."""
+    assigned = ArchivedAssignment.objects.filter(user=user).values('task_id')
+    return ArchivedTask.objects.filter(Q(creator=user) | Q(pk__in=assigned))
+
+
+CALENDAR_COLUMNS = ('id', 'slug', 'title', 'priority', 'status', 'due_date', 'occurrence')
+
+
+def _calendar_entry(row, virtual=False, **overrides):
+    entry = {
+        'task_id': row['id'],
+        'slug': row['slug'],
+        'title': row['title'],
+        'priority': row['priority'],
+        'status': row['status'],
+        'due_date': row['due_date'],
+        'occurrence': row['occurrence'],
+        'virtual': virtual,
+    }
+    entry.update(overrides)
+    return entry
+
+
+def calendar_entries(user, start, end):
+    """
+    What is due for `user` in start..end (inclusive), by due date: the task
+    rows due in the range plus the later occurrences of their repeating
+    tasks, which are expanded here and have no row of their own
+    (virtual=True; task_id is the series' current occurrence).
+    """
+    tasks = visible_tasks(user).order_by()
+    entries = [
+        _calendar_entry(row)
+        for row in tasks.filter(due_date__gte=start, due_date__lte=end).values(*CALENDAR_COLUMNS)
+    ]
+    series = tasks.exclude(recurrence='').filter(due_date__lte=end).values(
+        *CALENDAR_COLUMNS, 'recurrence', 'recurrence_start', 'recurrence_until', 'recurrence_count'
+    )
+    for row in series:
+        rule = Rule(row['recurrence'], row['recurrence_start'] or row['due_date'], row['recurrence_until'], row['recurrence_count'])
+        entries.extend(
+            _calendar_entry(row, virtual=True, status='pending', due_date=due_date, occurrence=occurrence)
+            for occurrence, due_date in rule.between(row['due_date'], row['occurrence'], start, end)
+        )
+    entries.sort(key=lambda entry: (entry['due_date'], entry['task_id'], entry['occurrence']))
+    return entries
+
 
+def notify_users(task, user_ids, message):
+    """Send `message` about `task` to each of `user_ids`, in one insert."""
+    user_ids = set(user_ids)
+    Notification.objects.bulk_create([Notification(user_id=user_id, message=message, task=task) for user_id in user_ids])
+    bump_notification_versions(user_ids)
 
-def notify_assigned(task, assigned_user, message=None):
+
+def notify_assignees(task, user_ids, message=None):
+    """Tell newly assigned users (ids) about `task`, in one insert."""
     if message is None:
         message = f'You were assigned to task: {task.title}'
-    Notification.objects.create(user=assigned_user, message=message, task=task)
+    notify_users(task, user_ids, message)
 
 
 def notify_status_update(task, message):
-    """Notify creator and assigned users about status change."""
-    users = [task.creator]
-    for u in task.assigned_users.all():
-        if u != task.creator:
-            users.append(u)
-    for user in users:
-        Notification.objects.create(user=user, message=message, task=task)
+    """Notify creator and assigned users about status change, in one insert."""
+    assignees = Task.assigned_users.through.objects.filter(task_id=task.pk).values_list('user_id', flat=True)
+    notify_users(task, [task.creator_id, *assignees], message)
+
+
+def get_read_watermark(user):
+    """Id of the newest notification `user` has marked read in bulk."""
+    watermark = Profile.objects.filter(user=user).values_list('last_read_notification_id', flat=True).first()
+    return watermark or 0
+
+
+def unread_notifications(user, watermark=None):
+    """Unread = above the watermark and not individually marked read."""
+    if watermark is None:
+        watermark = get_read_watermark(user)
+    return Notification.objects.filter(user=user, id__gt=watermark, is_read=False)
+
+
+def notification_is_read(notification, watermark):
+    return notification.is_read or notification.id <= watermark
+
+
+def mark_all_notifications_read(user, newest=None):
+    """Move the watermark up to the user's newest notification (one row write)."""
+    if newest is None:
+        newest = Notification.objects.filter(user=user).order_by('-id').values_list('id', flat=True).first()
+    if newest is None:
+        return
+    updated = Profile.objects.filter(user=user, last_read_notification_id__lt=newest).update(
+        last_read_notification_id=newest
+    )
+    if not updated:
+        _, updated = Profile.objects.get_or_create(user=user, defaults={'last_read_notification_id': newest})
+    if updated:
+        bump_notification_versions([user.pk])
+
+
+def record_event(task, kind, actor=None, extra_recipients=(), **data):
+    """
+    Append one activity-log entry for a change to `task`, for everyone who
+    can see it now plus the user ids in `extra_recipients`.
+    """
+    viewers = TaskAccess.objects.filter(task_id=task.pk).values_list('user_id', flat=True)
+    return TaskEvent.record(task.pk, kind, actor, [*viewers, *extra_recipients], data)
+
+
+def record_task_changes(task, actor, fields):
+    """Log an edit: a 'status' event for status changes, one 'updated' event for the rest."""
+    if 'status' in fields:
+        record_event(task, 'status', actor, status=task.status)
+    other = sorted(f for f in fields if f != 'status')
+    if other:
+        record_event(task, 'updated', actor, fields=other)
+
+
+def record_assignment_events(task, actor, diff):
+    """Log who was added to / removed from a task's assignees (an AssignmentDiff)."""
+    if diff.added:
+        record_event(task, 'assigned', actor, users=list(diff.added))
+    if diff.removed:
+        # They have lost access by now, but still hear that they were removed.
+        record_event(task, 'unassigned', actor, extra_recipients=diff.removed, users=list(diff.removed))
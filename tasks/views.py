@@ -3,18 +3,32 @@ from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.db.models import Q
+from django.core import signing
+from django.db.models import Sum
 from django.utils import timezone
-from django.http import HttpResponseForbidden, JsonResponse, Http404
+from django.http import HttpResponseBadRequest, HttpResponseForbidden, JsonResponse, Http404
 
-from .models import Task, Notification, Profile, TaskComment
+from .models import Task, Notification, Profile, TaskComment, DailyRollup, ConcurrentUpdate, ArchivedTask
 from .forms import UserRegistrationForm, TaskForm, TaskStatusForm, ProfileForm, CommentForm, UserUpdateForm
+from .routers import replica_reads
+from .notification_cache import bump_notification_versions
+from .pagination import dashboard_filters, dashboard_page, read_cursor
 from .utils import (
     user_can_edit_task,
     user_can_update_status,
     user_can_view_task,
-    notify_assigned,
+    notify_assignees,
     notify_status_update,
+    record_event,
+    record_task_changes,
+    record_assignment_events,
+    get_read_watermark,
+    notification_is_read,
+    mark_all_notifications_read,
+    user_task_role,
+    visible_tasks,
+    visible_archived_tasks,
+    calendar_entries,
 )
 
 
@@ -64,91 +78,95 @@ def logout_view(request):
     return redirect('tasks:home')
 
 
+@replica_reads
 @login_required
 def dashboard(request):
     """Personalized dashboard: created, assigned, completed, overdue."""
     user = request.user
     today = timezone.now().date()
 
-    created = Task.objects.filter(creator=user)
-    assigned = Task.objects.filter(assigned_users=user).exclude(creator=user)
-    my_tasks = (created | assigned).distinct()
+    my_tasks = visible_tasks(user)
 
     completed = my_tasks.filter(status='completed')
-    overdue = my_tasks.filter(due_date__lt=today).exclude(status='completed')
+    # due_state is kept current by Task.save and the sweep_due_dates command.
+    overdue = my_tasks.filter(due_state='overdue')
 
     # Quick stats for the overview cards
     total = my_tasks.count()
     completed_count = completed.count()
-    
+    overdue_count = overdue.count()
+
     # Exclude overdue tasks from Pending/In Progress counts.
-    # A task is overdue if its due_date < today AND it's not completed.
-    
-    pending_count = my_tasks.filter(
-        Q(status='pending') & (Q(due_date__gte=today) | Q(due_date__isnull=True))
-    ).count()
-    
-    in_progress_count = my_tasks.filter(
-        Q(status='in_progress') & (Q(due_date__gte=today) | Q(due_date__isnull=True))
-    ).count()
+    pending_count = my_tasks.filter(status='pending').exclude(due_state='overdue').count()
+    in_progress_count = my_tasks.filter(status='in_progress').exclude(due_state='overdue').count()
 
     # Weekly analytics
     week_start = today - timezone.timedelta(days=today.weekday())
-    completed_this_week = my_tasks.filter(
-        status='completed',
-        completed_at__date__gte=week_start
-    ).count()
+    completed_this_week = DailyRollup.objects.filter(user=user, day__gte=week_start).aggregate(
+        n=Sum('completed')
+    )['n'] or 0
     completion_percentage = round((completed_count / total * 100) if total else 0, 1)
 
-    # Handle search & filter from the query params
-    status_filter = request.GET.get('status')
-    priority_filter = request.GET.get('priority')
-    search = request.GET.get('q', '').strip()
-
-    created_qs = created
-    assigned_qs = assigned
-
-    if status_filter:
-        created_qs = created_qs.filter(status=status_filter)
-        assigned_qs = assigned_qs.filter(status=status_filter)
-    if priority_filter:
-        created_qs = created_qs.filter(priority=priority_filter)
-        assigned_qs = assigned_qs.filter(priority=priority_filter)
-    if search:
-        created_qs = created_qs.filter(
-            Q(title__icontains=search) | Q(description__icontains=search)
-        )
-        assigned_qs = assigned_qs.filter(
-            Q(title__icontains=search) | Q(description__icontains=search)
-        )
+    # Search & filter from the query params; only the first page of each list
+    # is rendered here, dashboard.js pulls the rest from dashboard_tasks.
+    filters = dashboard_filters(request.GET)
+    created_tasks, created_next = dashboard_page(user, 'created', filters)
+    assigned_tasks, assigned_next = dashboard_page(user, 'assigned', filters)
+
+    # Includes the coming occurrences of repeating tasks, which have no rows yet.
+    upcoming = [
+        entry for entry in calendar_entries(user, today, today + timezone.timedelta(days=6))
+        if entry['status'] != 'completed'
+    ]
 
     context = {
-        'created_tasks': created_qs,
-        'assigned_tasks': assigned_qs,
+        'upcoming': upcoming[:10],
+        'created_tasks': created_tasks,
+        'created_next': created_next,
+        'assigned_tasks': assigned_tasks,
+        'assigned_next': assigned_next,
         'completed_tasks': completed[:10],
         'overdue_tasks': overdue[:10],
+        'overdue_count': overdue_count,
         'total_tasks': total,
         'completed_count': completed_count,
         'pending_count': pending_count,
         'in_progress_count': in_progress_count,
         'completed_this_week': completed_this_week,
         'completion_percentage': completion_percentage,
-        'status_filter': status_filter,
-        'priority_filter': priority_filter,
-        'search': search,
+        'status_filter': filters.get('status'),
+        'priority_filter': filters.get('priority'),
+        'search': filters.get('q', ''),
     }
     return render(request, 'tasks/dashboard.html', context)
 
 
+@replica_reads
+@login_required
+def dashboard_tasks(request):
+    """Next page of a dashboard list as an HTML fragment, for infinite scroll."""
+    try:
+        list_name, filters, after = read_cursor(request.GET.get('cursor', ''))
+    except signing.BadSignature:
+        return HttpResponseBadRequest('Invalid cursor.')
+    tasks, next_cursor = dashboard_page(request.user, list_name, filters, after)
+    return render(request, 'tasks/dashboard_tasks.html', {
+        'list_name': list_name,
+        'tasks': tasks,
+        'next_cursor': next_cursor,
+    })
+
+
 @login_required
 def task_create(request):
     if request.method == 'POST':
         form = TaskForm(request.POST, creator=request.user)
         if form.is_valid():
             task = form.save()
+            record_event(task, 'created', request.user)
             # Let 'em know they've been assigned!
-            for u in task.assigned_users.all():
-                notify_assigned(task, u)
+            notify_assignees(task, form.assignment.added)
+            record_assignment_events(task, request.user, form.assignment)
             return redirect('tasks:task_detail', slug=task.slug)
         messages.error(request, 'Please correct the errors below.')
     else:
@@ -161,11 +179,12 @@ def task_detail(request, slug):
     try:
         task = get_object_or_404(Task, slug=slug)
     except Http404:
-        return render(request, '404.html', status=404)
-    if not user_can_view_task(request.user, task):
+        return archived_task_detail(request, slug)
+    role = user_task_role(request.user, task)
+    if role is None:
         return render(request, 'tasks/access_denied.html', status=403)
-    can_edit = user_can_edit_task(request.user, task)
-    can_update_status = user_can_update_status(request.user, task)
+    can_edit = role == 'owner'
+    can_update_status = True
     status_form = TaskStatusForm(instance=task) if can_update_status else None
     comments = task.comments.select_related('user').all()
     comment_form = CommentForm()
@@ -179,6 +198,22 @@ def task_detail(request, slug):
     })
 
 
+def archived_task_detail(request, slug):
+    """Read-only page for an archived task, so its old links keep working."""
+    if not ArchivedTask.objects.filter(slug=slug).exists():
+        return render(request, '404.html', status=404)
+    task = visible_archived_tasks(request.user).filter(slug=slug).select_related('creator').first()
+    if task is None:
+        return render(request, 'tasks/access_denied.html', status=403)
+    return render(request, 'tasks/task_detail.html', {
+        'task': task,
+        'archived': True,
+        'can_edit': False,
+        'can_update_status': False,
+        'comments': task.comments.select_related('user').all(),
+    })
+
+
 @login_required
 def task_add_comment(request, slug):
     try:
@@ -194,6 +229,7 @@ def task_add_comment(request, slug):
             comment.task = task
             comment.user = request.user
             comment.save()
+            record_event(task, 'commented', request.user, comment=comment.pk)
             messages.success(request, 'Comment added.')
             return redirect('tasks:task_detail', slug=task.slug)
     return redirect('tasks:task_detail', slug=task.slug)
@@ -210,12 +246,15 @@ def task_edit(request, slug):
     if request.method == 'POST':
         form = TaskForm(request.POST, instance=task, creator=request.user)
         if form.is_valid():
-            old_assigned = set(task.assigned_users.values_list('pk', flat=True))
-            task = form.save()
-            new_assigned = set(task.assigned_users.values_list('pk', flat=True))
-            for uid in new_assigned - old_assigned:
-                u = task.assigned_users.get(pk=uid)
-                notify_assigned(task, u)
+            try:
+                task = form.save()
+            except ConcurrentUpdate:
+                messages.error(request, 'Someone else changed this task while you were editing it. '
+                                        'Your changes were not saved; this is the latest version.')
+                return redirect('tasks:task_edit', slug=slug)
+            notify_assignees(task, form.assignment.added)
+            record_task_changes(task, request.user, [f for f in form.changed_data if f != 'assigned_usernames'])
+            record_assignment_events(task, request.user, form.assignment)
             messages.success(request, f'Task "{task.title}" updated.')
             return redirect('tasks:task_detail', slug=task.slug)
         messages.error(request, 'Please correct the errors below.')
@@ -234,7 +273,7 @@ def task_delete(request, slug):
         return render(request, 'tasks/access_denied.html', status=403)
     if request.method == 'POST':
         title = task.title
-        task.delete()
+        task.soft_delete(actor=request.user)
         messages.success(request, f'Task "{title}" deleted.')
         return redirect('tasks:dashboard')
     return render(request, 'tasks/task_confirm_delete.html', {'task': task})
@@ -249,11 +288,17 @@ def task_update_status(request, slug):
     if not user_can_update_status(request.user, task):
         return render(request, 'tasks/access_denied.html', status=403)
     if request.method == 'POST':
+        # Read before validation: is_valid() copies the new status onto task.
+        old_status = task.status
         form = TaskStatusForm(request.POST, instance=task)
         if form.is_valid():
-            old_status = task.status
-            form.save()
+            try:
+                form.save()
+            except ConcurrentUpdate:
+                messages.error(request, 'This task was changed by someone else. Check its status and try again.')
+                return redirect('tasks:task_detail', slug=task.slug)
             if task.status != old_status:
+                record_event(task, 'status', request.user, status=task.status)
                 notify_status_update(
                     task,
                     f'Task "{task.title}" status changed to {task.get_status_display()}.'
@@ -265,17 +310,20 @@ def task_update_status(request, slug):
 
 @login_required
 def notification_list(request):
-    notifications = Notification.objects.filter(user=request.user)[:50]
-    # Mark all unread notifications as read on page load
-    Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+    watermark = get_read_watermark(request.user)
+    notifications = list(Notification.objects.filter(user=request.user).select_related('task', 'archived_task')[:50])
+    for n in notifications:
+        n.is_read = notification_is_read(n, watermark)
+    # Mark everything read on page load by moving the watermark (one row).
+    mark_all_notifications_read(request.user, max((n.id for n in notifications), default=None))
     return render(request, 'tasks/notifications.html', {'notifications': notifications})
 
 
 @login_required
 def notification_mark_read(request, pk):
-    notification = get_object_or_404(Notification, pk=pk, user=request.user)
-    notification.is_read = True
-    notification.save()
+    if not Notification.objects.filter(pk=pk, user=request.user).update(is_read=True):
+        raise Http404('Notification not found')
+    bump_notification_versions([request.user.pk])
     if request.GET.get('next'):
         return redirect(request.GET.get('next'))
     return redirect('tasks:notifications')
@@ -306,6 +354,7 @@ def profile_view(request):
     return render(request, 'tasks/profile.html', context)
 
 
+@replica_reads
 @login_required
 def user_search_api(request):
     """Return usernames matching query (for assignee autocomplete)."""
@@ -0,0 +1,70 @@
+"""
+Optional warm-up for freshly started workers.
+todo.wsgi / todo.asgi call warm_up() when WARMUP_ON_STARTUP is set (env
+TODO_WARMUP=1), before the server hands the worker any requests. It does
+the work the first requests would otherwise pay for: importing the lazily
+routed views, building the URL resolver's reverse map, compiling every
+project template into the cached loader, and reading the static manifest.
+Database connections are deliberately not opened: with `gunicorn --preload`
+this runs in the master, whose connections would be inherited by every
+forked worker, and threaded/ASGI workers serve requests on other threads
+anyway.
+"""
+import logging
+import time
+from pathlib import Path
+
+from django.db import connections
+from django.template import engines
+from django.template.exceptions import TemplateSyntaxError
+from django.urls import get_resolver, reverse
+from rest_framework.settings import api_settings
+
+from .lazyurls import lazy_views
+from .staticfiles import fingerprinted_names
+
+logger = logging.getLogger(__name__)
+
+
+def import_lazy_views():
+    views = list(lazy_views(get_resolver().url_patterns))
+    for view in views:
+        view.resolve()
+    return len(views)
+
+
+def compile_templates():
+    """Load every .html under the TEMPLATES DIRS into the (cached) template loaders."""
+    compiled = 0
+    for engine in engines.all():
+        for directory in engine.dirs:
+            for path in sorted(Path(directory).rglob('*.html')):
+                try:
+                    engine.get_template(path.relative_to(directory).as_posix())
+                except TemplateSyntaxError:
+                    logger.exception('Template %s failed to compile during warm-up', path)
+                    continue
+                compiled += 1
+    return compiled
+
+
+def prime_caches():
+    # The first reverse() builds the resolver's reverse dictionary.
+    reverse('tasks:home')
+    fingerprinted_names()
+    # DRF imports its configured classes (tasks.authentication etc.) on first use.
+    for name in ('DEFAULT_AUTHENTICATION_CLASSES', 'DEFAULT_RENDERER_CLASSES', 'DEFAULT_PARSER_CLASSES'):
+        getattr(api_settings, name)
+
+
+def warm_up():
+    """Run every warm-up step; returns {step: seconds}."""
+    timings = {}
+    for step in (import_lazy_views, compile_templates, prime_caches):
+        started = time.perf_counter()
+        step()
+        timings[step.__name__] = time.perf_counter() - started
+    # In case a step touched the database: never hand a connection to a fork.
+    connections.close_all()
+    logger.info('Worker warm-up: %s', ', '.join(f'{name} {seconds * 1000:.0f} ms' for name, seconds in timings.items()))
+    return timings
@@ -2,6 +2,7 @@
 Django settings for collaborative task management project.
 """
 
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -25,22 +26,39 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'tasks.authentication.TokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
+        # Kept for existing scripts; prefer tokens (issue_api_token), Basic
+        # runs a full password hash on every request.
         'rest_framework.authentication.BasicAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson-backed when installed; see tasks.renderers for how it differs.
+    'DEFAULT_RENDERER_CLASSES': [
+        'tasks.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+# Validated API tokens are cached in-process for this many seconds.
+API_TOKEN_CACHE_SIZE = 1024
+API_TOKEN_CACHE_TTL = 30
+# Notification poll responses are cached in-process (keyed by a per-user
+# version, so writes show up at once) for at most this many seconds.
+NOTIFICATION_CACHE_SECONDS = 30
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'tasks.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'tasks.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'todo.urls'
@@ -72,6 +90,47 @@ DATABASES = {
     }
 }
 
+# Optional read replica. Read-heavy views marked with @replica_reads read from
+# it; everything else (and any client that wrote in the last few seconds)
+# stays on the primary. Locally, point this at a second SQLite file and keep
+# it in sync with `manage.py sync_replica`.
+REPLICA_DB_NAME = os.environ.get('TODO_REPLICA_DB')
+if REPLICA_DB_NAME:
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': REPLICA_DB_NAME,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Caches: 'default' is per-process memory, 'shared' is visible to every
+# worker on the host (files under TODO_CACHE_DIR, or a local Redis socket
+# when TODO_REDIS_SOCKET is set). Sessions use cached_db on the shared
+# cache so polling requests skip the session-table read.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'todo-default',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('TODO_CACHE_DIR', str(BASE_DIR / '.cache')),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+if os.environ.get('TODO_REDIS_SOCKET'):
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f"unix://{os.environ['TODO_REDIS_SOCKET']}",
+    }
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'shared'
+
+DATABASE_ROUTERS = ['tasks.routers.ReadReplicaRouter']
+READ_REPLICA_ALIAS = 'replica'
+READ_REPLICA_PIN_COOKIE = 'db_pin'
+READ_REPLICA_PIN_SECONDS = 10
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -88,11 +147,32 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static'] if (BASE_DIR / 'static').exists() else []
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic fingerprints, minifies and pre-compresses (gzip, plus brotli
+# when installed) everything; tasks.staticfiles.serve_static serves the
+# hashed files with immutable caching.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'tasks.staticfiles.CompressedManifestStaticFilesStorage'},
+}
+
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# On-demand profiling (see tasks/profiling.py). Set PROFILING_ENGINE to
+# 'pyinstrument' to use the sampling profiler when it is installed.
+PROFILING_DIR = BASE_DIR / 'profiles'
+PROFILING_ENGINE = 'cprofile'
+PROFILING_TOKEN_MAX_AGE = 3600
+
+# Import lazily routed views and compile templates when a worker starts,
+# before it takes requests (see tasks.warmup).
+WARMUP_ON_STARTUP = os.environ.get('TODO_WARMUP') == '1'
+
+# Where the backup_db command writes database snapshots.
+BACKUP_DIR = Path(os.environ.get('TODO_BACKUP_DIR', BASE_DIR / 'backups'))
+
 LOGIN_URL = 'tasks:login'
 LOGIN_REDIRECT_URL = 'tasks:dashboard'
 LOGOUT_REDIRECT_URL = 'tasks:home'
@@ -6,9 +6,12 @@ from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from tasks.views import custom_404_view
+from tasks.staticfiles import serve_static
 
 urlpatterns = [
+    path('admin/profiles/', include('tasks.profiling')),
     path('admin/', admin.site.urls),
+    re_path(r'^%s(?P<path>.+)$' % settings.STATIC_URL.lstrip('/'), serve_static),
     path('', include('tasks.urls')),
 ]
 
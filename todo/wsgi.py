@@ -2,7 +2,12 @@
 WSGI config for config project.
 """
 import os
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todo.settings')
 application = get_wsgi_application()
+
+if settings.WARMUP_ON_STARTUP:
+    from tasks.warmup import warm_up
+    warm_up()